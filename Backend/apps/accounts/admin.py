@@ -1,12 +1,34 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 
+from apps.core.admin import ScalableAdminMixin
+from .directory import get_user_directory
 from .models import User
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ScalableAdminMixin, UserAdmin):
     model = User
     list_display = ("id", "username", "full_name", "role", "group", "is_active")
+    list_select_related = ("group",)
+    list_filter = ("role", "group", "is_active")
+    search_fields = ("username", "full_name", "workplace")
+    ordering = ("-id",)
+    actions = ["activate_users", "deactivate_users"]
     fieldsets = UserAdmin.fieldsets + (("Extra", {"fields": ("full_name", "workplace", "role", "group")}),)
     add_fieldsets = UserAdmin.add_fieldsets + (("Extra", {"fields": ("full_name", "workplace", "role", "group")}),)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_user_directory().filter(queryset, search_term), False
+
+    @admin.action(description="Tanlanganlarni faollashtirish", permissions=["change"])
+    def activate_users(self, request, queryset):
+        count = queryset.update(is_active=True)
+        self.message_user(request, f"{count} ta foydalanuvchi faollashtirildi", messages.SUCCESS)
+
+    @admin.action(description="Tanlanganlarni bloklash", permissions=["change"])
+    def deactivate_users(self, request, queryset):
+        count = queryset.exclude(id=request.user.id).update(is_active=False)
+        self.message_user(request, f"{count} ta foydalanuvchi bloklandi", messages.SUCCESS)
@@ -0,0 +1,62 @@
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from apps.core.search import TOKEN_RE, SQLiteFTSIndex, fts_match
+
+SEARCH_FIELDS = ("username", "full_name", "workplace")
+
+
+class DatabaseUserDirectory:
+    """Portable fallback: every query token must prefix-match a field or a word inside it."""
+
+    def index(self, users):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def filter(self, queryset, query):
+        for token in TOKEN_RE.findall(query):
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f"{field}__istartswith": token}) | Q(**{f"{field}__icontains": f" {token}"})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class SQLiteUserDirectory:
+    """Every token prefix-matches a word, through an FTS5 table over username, full name and workplace."""
+
+    table = "accounts_user_fts"
+
+    def __init__(self):
+        self.fts = SQLiteFTSIndex(self.table, SEARCH_FIELDS, "SELECT id, username, full_name, workplace FROM accounts_user")
+
+    def index(self, users):
+        self.fts.upsert([(u.id, u.username, u.full_name, u.workplace) for u in users])
+
+    def remove(self, ids):
+        self.fts.remove(ids)
+
+    def rebuild(self):
+        self.fts.rebuild()
+
+    def filter(self, queryset, query):
+        match = fts_match(query, prefix_all=True)
+        if not match:
+            return queryset
+        self.fts.ensure()
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]))
+
+
+@lru_cache(maxsize=None)
+def get_user_directory():
+    if connection.vendor == "sqlite":
+        return SQLiteUserDirectory()
+    return DatabaseUserDirectory()
@@ -14,5 +14,12 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=UserRole.choices, default=UserRole.PARTICIPANT)
     group = models.ForeignKey("core.Group", null=True, blank=True, on_delete=models.SET_NULL, related_name="users")
 
+    class Meta(AbstractUser.Meta):
+        # Directory filters walk these in id order for keyset pagination.
+        indexes = [
+            models.Index(fields=["role", "id"], name="accounts_user_role_id"),
+            models.Index(fields=["group", "id"], name="accounts_user_group_id"),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role})"
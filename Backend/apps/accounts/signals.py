@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .directory import SEARCH_FIELDS, get_user_directory
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only; skip the index for those.
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    get_user_directory().index([instance])
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    get_user_directory().remove([instance.id])
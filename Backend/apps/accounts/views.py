@@ -4,15 +4,55 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.core.fast_serializers import FastListMixin, user_rows
+from .directory import get_user_directory
 from .models import User
 from .permissions import IsAdminRole
 from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+USER_DIRECTORY_PARAMS = {"q", "role", "group_id", "cursor", "limit"}
+USER_DIRECTORY_MAX_LIMIT = 200
+
+
+def _to_int(v, default=None):
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return default
+
+
+class UserViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = User.objects.select_related("group").all().order_by("-id")
     serializer_class = UserSerializer
     permission_classes = [IsAdminRole]
+    fast_rows = user_rows
+
+    def list(self, request, *args, **kwargs):
+        """
+        Without query params: every user (what the current frontend expects).
+        With any of q/role/group_id/cursor/limit: one keyset page, newest first;
+        pass `nextCursor` back as `cursor` for the following page.
+        """
+        params = request.query_params
+        if not USER_DIRECTORY_PARAMS & set(params):
+            return super().list(request, *args, **kwargs)
+
+        limit = min(USER_DIRECTORY_MAX_LIMIT, max(1, _to_int(params.get("limit"), 50)))
+        qs = User.objects.all()
+        if params.get("q"):
+            qs = get_user_directory().filter(qs, params["q"])
+        if params.get("role"):
+            qs = qs.filter(role=params["role"])
+        if params.get("group_id"):
+            qs = qs.filter(group_id=_to_int(params["group_id"]))
+        cursor = _to_int(params.get("cursor"))
+        if cursor:
+            qs = qs.filter(id__lt=cursor)
+
+        rows = user_rows(qs.order_by("-id")[: limit + 1])
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return Response({"results": rows[:limit], "nextCursor": next_cursor, "limit": limit})
 
 
 @api_view(["POST"])
@@ -1,15 +1,71 @@
-from django.contrib import admin
+from datetime import timedelta
 
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .archive import archive_results
 from .models import Group, Module, ModuleSubjectConfig, Question, Subject, TestResult
+from .paginators import EstimatedCountChangeList, EstimatedCountPaginator
+from .search import get_search_backend
+from .services import delete_results
+
+
+class RecentDateFilter(admin.SimpleListFilter):
+    """
+    Index range scans on `date`. Django's date_hierarchy runs SELECT DISTINCT
+    over a per-row date truncation of the whole table on every page load.
+    """
+
+    title = "sana"
+    parameter_name = "period"
+    PERIODS = {"1": ("Oxirgi 24 soat", 1), "7": ("Oxirgi 7 kun", 7), "30": ("Oxirgi 30 kun", 30), "365": ("Oxirgi yil", 365)}
+    OLDER = "older"
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, (label, _) in self.PERIODS.items()] + [(self.OLDER, "Bir yildan eski")]
+
+    def queryset(self, request, queryset):
+        if self.value() == self.OLDER:
+            return queryset.filter(date__lt=timezone.now() - timedelta(days=365))
+        if self.value() in self.PERIODS:
+            return queryset.filter(date__gte=timezone.now() - timedelta(days=self.PERIODS[self.value()][1]))
+        return queryset
+
+
+class ScalableAdminMixin:
+    """Changelist defaults for tables that grow without bound."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
+    def get_actions(self, request):
+        # The stock action renders every selected object (and its cascade) on the confirmation page.
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+
+class SoftDeleteAdminMixin:
+    """Delete tombstones the row like the API does; a real delete would cascade to results."""
+
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+
+    def delete_queryset(self, request, queryset):
+        queryset.soft_delete()
 
 
 @admin.register(Group)
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ("id", "name", "is_archived", "created_at")
 
 
 @admin.register(Subject)
-class SubjectAdmin(admin.ModelAdmin):
+class SubjectAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ("id", "name", "is_demo")
 
 
@@ -19,17 +75,52 @@ class ModuleSubjectConfigInline(admin.TabularInline):
 
 
 @admin.register(Module)
-class ModuleAdmin(admin.ModelAdmin):
+class ModuleAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ("id", "name", "is_demo", "is_active", "duration_minutes", "passing_score")
     filter_horizontal = ("groups",)
     inlines = [ModuleSubjectConfigInline]
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("id", "subject", "correct_index")
+class QuestionAdmin(SoftDeleteAdminMixin, ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "subject", "text", "correct_index")
+    list_select_related = ("subject",)
+    list_filter = ("subject__is_demo", "subject")
+    search_fields = ("text",)
+    actions = ["soft_delete_questions"]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Through the question search index instead of LIKE '%term%' over every row.
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, search_term), False
+
+    @admin.action(description="Tanlangan savollarni o'chirish (soft delete)", permissions=["delete"])
+    def soft_delete_questions(self, request, queryset):
+        count = queryset.soft_delete()
+        self.message_user(request, f"{count} ta savol o'chirildi", messages.SUCCESS)
 
 
 @admin.register(TestResult)
-class TestResultAdmin(admin.ModelAdmin):
-    list_display = ("id", "participant", "module", "score", "is_passed", "date")
+class TestResultAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "participant", "module", "group", "score", "is_passed", "date")
+    list_select_related = ("participant", "module", "group")
+    list_filter = (RecentDateFilter, "is_passed", "module__is_demo", "module", "group")
+    raw_id_fields = ("participant", "module", "group")
+    actions = ["delete_selected_results", "archive_selected_results"]
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, TestResult.objects.filter(id=obj.id))
+
+    def delete_queryset(self, request, queryset):
+        delete_results(queryset)
+
+    @admin.action(description="Tanlangan natijalarni o'chirish", permissions=["delete"])
+    def delete_selected_results(self, request, queryset):
+        count = delete_results(queryset)
+        self.message_user(request, f"{count} ta natija o'chirildi", messages.SUCCESS)
+
+    @admin.action(description="Tanlangan natijalarni arxivlash", permissions=["delete"])
+    def archive_selected_results(self, request, queryset):
+        file_name, count = archive_results(queryset)
+        self.message_user(request, f"{count} ta natija -> {file_name}" if count else "Arxivlanadigan natija yo'q", messages.SUCCESS)
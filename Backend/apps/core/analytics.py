@@ -0,0 +1,105 @@
+import numpy as np
+
+from .models import Question, QuestionDifficulty, QuestionStats, ResultAnswers
+
+# One record per answered question: question id + chosen option (-1 = not answered).
+ANSWER_DTYPE = np.dtype([("question_id", "<u4"), ("chosen", "i1")])
+OPTION_COUNT = 4
+
+
+def pack_answers(pairs):
+    return np.array(list(pairs), dtype=ANSWER_DTYPE).tobytes()
+
+
+def unpack_answers(data):
+    return np.frombuffer(bytes(data), dtype=ANSWER_DTYPE)
+
+
+def compute_item_stats(module):
+    """
+    Classical item analysis over every stored submission of `module`:
+    difficulty = share of correct answers, discrimination = point-biserial
+    correlation of the item with the rest score, plus chosen-option counts.
+    """
+    rows = list(ResultAnswers.objects.filter(module=module).values_list("data", flat=True))
+    if not rows:
+        QuestionStats.objects.filter(module=module).delete()
+        return []
+
+    records = np.frombuffer(b"".join(bytes(r) for r in rows), dtype=ANSWER_DTYPE)
+    sizes = np.fromiter((len(r) // ANSWER_DTYPE.itemsize for r in rows), dtype=np.int64, count=len(rows))
+    result_idx = np.repeat(np.arange(len(rows)), sizes)
+
+    question_ids, q_idx = np.unique(records["question_id"], return_inverse=True)
+    key_map = dict(Question.all_objects.filter(id__in=question_ids.tolist()).values_list("id", "correct_index"))
+    keys = np.array([key_map.get(int(qid), -2) for qid in question_ids], dtype=np.int8)
+
+    chosen = records["chosen"]
+    correct = (chosen == keys[q_idx]).astype(np.float64)
+    rest = np.bincount(result_idx, weights=correct, minlength=len(rows))[result_idx] - correct
+
+    nq = len(question_ids)
+    n = np.bincount(q_idx, minlength=nq).astype(np.float64)
+    sx = np.bincount(q_idx, weights=correct, minlength=nq)
+    sr = np.bincount(q_idx, weights=rest, minlength=nq)
+    sxr = np.bincount(q_idx, weights=correct * rest, minlength=nq)
+    srr = np.bincount(q_idx, weights=rest * rest, minlength=nq)
+
+    difficulty = sx / n
+    denom = np.sqrt((n * sx - sx * sx) * (n * srr - sr * sr))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discrimination = np.where(denom > 0, (n * sxr - sx * sr) / denom, np.nan)
+
+    answered = (chosen >= 0) & (chosen < OPTION_COUNT)
+    option_counts = np.bincount(
+        q_idx[answered] * OPTION_COUNT + chosen[answered],
+        minlength=nq * OPTION_COUNT,
+    ).reshape(nq, OPTION_COUNT)
+
+    stats = [
+        QuestionStats(
+            module=module,
+            question_id=int(question_ids[i]),
+            responses=int(n[i]),
+            difficulty=float(difficulty[i]),
+            discrimination=None if np.isnan(discrimination[i]) else float(discrimination[i]),
+            option_counts=option_counts[i].tolist(),
+        )
+        for i in range(nq)
+        if int(question_ids[i]) in key_map
+    ]
+    QuestionStats.objects.filter(module=module).exclude(question_id__in=[s.question_id for s in stats]).delete()
+    QuestionStats.objects.bulk_create(
+        stats,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["module", "question"],
+        update_fields=["responses", "difficulty", "discrimination", "option_counts", "computed_at"],
+    )
+    return stats
+
+
+def compute_question_difficulty(chunk_size=5000):
+    """Recount QuestionDifficulty (attempts, correct) per question from every stored submission."""
+    attempts, correct = {}, {}
+    key_map = dict(Question.all_objects.values_list("id", "correct_index"))
+    rows = ResultAnswers.objects.values_list("data", flat=True).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = [bytes(r) for _, r in zip(range(chunk_size), rows)]
+        if not chunk:
+            break
+        records = np.frombuffer(b"".join(chunk), dtype=ANSWER_DTYPE)
+        question_ids, q_idx = np.unique(records["question_id"], return_inverse=True)
+        keys = np.array([key_map.get(int(qid), -2) for qid in question_ids], dtype=np.int8)
+        hits = np.bincount(q_idx, weights=(records["chosen"] == keys[q_idx]), minlength=len(question_ids))
+        seen = np.bincount(q_idx, minlength=len(question_ids))
+        for qid, n, c in zip(question_ids.tolist(), seen.tolist(), hits.tolist()):
+            attempts[qid] = attempts.get(qid, 0) + n
+            correct[qid] = correct.get(qid, 0) + int(c)
+
+    QuestionDifficulty.objects.all().delete()
+    QuestionDifficulty.objects.bulk_create(
+        [QuestionDifficulty(question_id=qid, attempts=n, correct=correct[qid]) for qid, n in attempts.items() if qid in key_map],
+        batch_size=1000,
+    )
+    return len(attempts)
@@ -12,6 +12,8 @@ class CoreConfig(AppConfig):
         django.template.context.BaseContext.__copy__ uses copy(super()),
         which raises AttributeError on Python 3.14.
         """
+        from . import signals  # noqa: F401
+
         try:
             from django.template.context import BaseContext
 
@@ -0,0 +1,239 @@
+import base64
+import gzip
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.accounts.models import User
+from .leaderboard import rebuild_entries
+from .models import ArchivedResultSummary, Group, MainAttempt, Module, ResultAnswers, TestResult
+from .summaries import invalidate_summaries
+
+ARCHIVE_NAME_SUFFIX = ".jsonl.gz"
+
+
+def archive_dir():
+    path = Path(settings.ARCHIVE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def archive_path(file_name):
+    if "/" in file_name or "\\" in file_name or not file_name.endswith(ARCHIVE_NAME_SUFFIX):
+        return None
+    path = archive_dir() / file_name
+    return path if path.is_file() else None
+
+
+def _record(result, answers):
+    return {
+        "id": result.id,
+        "participantId": result.participant_id,
+        "participantUsername": result.participant.username,
+        "moduleId": result.module_id,
+        "groupId": result.group_id,
+        "correctAnswers": result.correct_answers,
+        "totalQuestions": result.total_questions,
+        "score": result.score,
+        "isPassed": result.is_passed,
+        "date": result.date.isoformat(),
+        "timeTaken": result.time_taken,
+        "answers": base64.b64encode(bytes(answers)).decode() if answers is not None else None,
+    }
+
+
+def _append(path, records):
+    # Each batch is its own gzip member: a crash never corrupts batches already written.
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for record in records:
+                gz.write(json.dumps(record, cls=DjangoJSONEncoder).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_results(queryset, batch_size=1000):
+    """Move `queryset` results into a new append-only archive file; returns (file_name, count)."""
+    file_name = f"results-{timezone.now():%Y%m%d-%H%M%S}{ARCHIVE_NAME_SUFFIX}"
+    path = archive_dir() / file_name
+    total = 0
+
+    while True:
+        batch = list(queryset.select_related("participant", "module", "group").order_by("id")[:batch_size])
+        if not batch:
+            break
+        ids = [r.id for r in batch]
+        answers = dict(ResultAnswers.objects.filter(result_id__in=ids).values_list("result_id", "data"))
+        _append(path, [_record(r, answers.get(r.id)) for r in batch])
+
+        summaries = {}
+        for r in batch:
+            s = summaries.get((r.module_id, r.group_id))
+            if s is None:
+                s = summaries[(r.module_id, r.group_id)] = ArchivedResultSummary(
+                    file_name=file_name,
+                    module_id=r.module_id,
+                    module_name=r.module.name,
+                    group_id=r.group_id,
+                    group_name=r.group.name if r.group else "",
+                    first_date=r.date,
+                    last_date=r.date,
+                )
+            s.result_count += 1
+            s.passed_count += int(r.is_passed)
+            s.score_sum += r.score
+            s.first_date = min(s.first_date, r.date)
+            s.last_date = max(s.last_date, r.date)
+
+        # Records only become visible through a summary row, which commits together with the delete.
+        with transaction.atomic():
+            ArchivedResultSummary.objects.bulk_create(summaries.values())
+            # The exam stays taken after its result leaves the hot table.
+            MainAttempt.objects.bulk_create(
+                [MainAttempt(participant_id=r.participant_id, module_id=r.module_id) for r in batch if not r.module.is_demo],
+                ignore_conflicts=True,
+            )
+            ResultAnswers.objects.filter(result_id__in=ids).delete()
+            TestResult.objects.filter(id__in=ids).delete()
+            rebuild_entries(pairs={(r.module_id, r.participant_id) for r in batch})
+            invalidate_summaries({r.participant_id for r in batch})
+        total += len(ids)
+
+    return (file_name if total else None), total
+
+
+def iter_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _not_in_hot_table(records, chunk_size=1000):
+    # A partly restored (module, group) keeps its summary row; the records that did go back are skipped here.
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield from _drop_hot(chunk)
+            chunk = []
+    yield from _drop_hot(chunk)
+
+
+def _drop_hot(records):
+    hot = set(TestResult.objects.filter(id__in=[r["id"] for r in records]).values_list("id", flat=True)) if records else set()
+    return [r for r in records if r["id"] not in hot]
+
+
+def _summary(file_name, template, records):
+    dates = [parse_datetime(r["date"]) for r in records]
+    return ArchivedResultSummary(
+        file_name=file_name,
+        module_id=template.module_id,
+        module_name=template.module_name,
+        group_id=template.group_id,
+        group_name=template.group_name,
+        result_count=len(records),
+        passed_count=sum(1 for r in records if r["isPassed"]),
+        score_sum=sum(r["score"] for r in records),
+        first_date=min(dates),
+        last_date=max(dates),
+    )
+
+
+def read_archived(module_id=None, group_id=None, participant_id=None, limit=1000):
+    """Records still covered by a summary row, i.e. archived and not restored."""
+    summaries = ArchivedResultSummary.objects.all()
+    if module_id:
+        summaries = summaries.filter(module_id=module_id)
+    if group_id:
+        summaries = summaries.filter(group_id=group_id)
+    live = {}
+    for file_name, m_id, g_id in summaries.values_list("file_name", "module_id", "group_id"):
+        live.setdefault(file_name, set()).add((m_id, g_id))
+
+    records = []
+    for file_name in sorted(live, reverse=True):
+        path = archive_path(file_name)
+        if not path:
+            continue
+        matching = (
+            record
+            for record in iter_archive(path)
+            if (record["moduleId"], record["groupId"]) in live[file_name]
+            and (not participant_id or record["participantId"] == participant_id)
+        )
+        for record in _not_in_hot_table(matching):
+            records.append(record)
+            if len(records) >= limit:
+                return records
+    return records
+
+
+@transaction.atomic
+def restore_archive(file_name, module_id=None, group_id=None):
+    """
+    Put archived results back into the hot table; returns (restored, skipped).
+    Records that cannot go back (participant or module gone) stay listed:
+    their (module, group) summary is rewritten to cover just them.
+    """
+    path = archive_path(file_name)
+    if not path:
+        raise FileNotFoundError(file_name)
+    summaries = ArchivedResultSummary.objects.filter(file_name=file_name)
+    if module_id:
+        summaries = summaries.filter(module_id=module_id)
+    if group_id:
+        summaries = summaries.filter(group_id=group_id)
+    keys = set(summaries.values_list("module_id", "group_id"))
+
+    records = [r for r in iter_archive(path) if (r["moduleId"], r["groupId"]) in keys]
+    user_ids = set(User.objects.filter(id__in={r["participantId"] for r in records}).values_list("id", flat=True))
+    module_ids = set(Module.all_objects.filter(id__in={r["moduleId"] for r in records}).values_list("id", flat=True))
+    group_ids = set(Group.all_objects.filter(id__in={r["groupId"] for r in records if r["groupId"]}).values_list("id", flat=True))
+    existing = set(TestResult.objects.filter(id__in=[r["id"] for r in records]).values_list("id", flat=True))
+
+    results, dates, answers, skipped = [], [], [], 0
+    left = {}
+    for r in records:
+        if r["id"] in existing:
+            skipped += 1
+            continue
+        if r["participantId"] not in user_ids or r["moduleId"] not in module_ids:
+            skipped += 1
+            left.setdefault((r["moduleId"], r["groupId"]), []).append(r)
+            continue
+        result = TestResult(
+            id=r["id"],
+            participant_id=r["participantId"],
+            module_id=r["moduleId"],
+            group_id=r["groupId"] if r["groupId"] in group_ids else None,
+            correct_answers=r["correctAnswers"],
+            total_questions=r["totalQuestions"],
+            score=r["score"],
+            is_passed=r["isPassed"],
+            time_taken=r["timeTaken"],
+        )
+        results.append(result)
+        dates.append(parse_datetime(r["date"]))
+        if r["answers"]:
+            answers.append(ResultAnswers(result_id=r["id"], module_id=r["moduleId"], data=base64.b64decode(r["answers"])))
+
+    TestResult.objects.bulk_create(results, batch_size=500)
+    # auto_now_add overwrote `date` on insert; put the original submission time back.
+    for result, date in zip(results, dates):
+        result.date = date
+    TestResult.objects.bulk_update(results, ["date"], batch_size=500)
+    ResultAnswers.objects.bulk_create(answers, batch_size=500)
+    templates = {(s.module_id, s.group_id): s for s in summaries}
+    summaries.delete()
+    ArchivedResultSummary.objects.bulk_create([_summary(file_name, templates[key], rows) for key, rows in left.items()])
+    rebuild_entries(pairs={(r.module_id, r.participant_id) for r in results})
+    invalidate_summaries({r.participant_id for r in results})
+    return len(results), skipped
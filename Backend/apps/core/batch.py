@@ -0,0 +1,160 @@
+from django.db import transaction
+
+from apps.accounts.models import User
+from apps.accounts.serializers import UserSerializer
+from .models import Group, Module, Question, Subject
+from .search import get_search_backend
+from .serializers import GroupSerializer, ModuleSerializer, QuestionSerializer, SubjectSerializer
+from .services import upsert_questions
+
+BATCH_MAX_OPERATIONS = 1000
+BATCH_TYPES = {
+    "group": (Group, GroupSerializer),
+    "subject": (Subject, SubjectSerializer),
+    "module": (Module, ModuleSerializer),
+    "question": (Question, QuestionSerializer),
+    "user": (User, UserSerializer),
+}
+# Creates of these types have no nested writes, so a run of them becomes one bulk_create.
+BULK_CREATE_TYPES = {"subject", "question"}
+REF_FIELDS = ("groupIds", "moduleIds", "subjectId", "groupId")
+
+
+class BatchError(Exception):
+    def __init__(self, index, detail):
+        super().__init__(detail)
+        self.index = index
+        self.detail = detail
+
+
+def _runs(operations):
+    """Group consecutive operations with the same (op, type)."""
+    run = []
+    for index, operation in enumerate(operations):
+        if run and (operation.get("op"), operation.get("type")) != (run[0][1].get("op"), run[0][1].get("type")):
+            yield run
+            run = []
+        run.append((index, operation))
+    if run:
+        yield run
+
+
+class BatchRunner:
+    def __init__(self, user):
+        self.user = user
+        self.temp_ids = {}
+        self.results = {}
+
+    def _ref(self, value):
+        if isinstance(value, str) and value in self.temp_ids:
+            return self.temp_ids[value]
+        return value
+
+    def _resolve(self, data):
+        data = dict(data)
+        for key in REF_FIELDS:
+            if key not in data:
+                continue
+            value = data[key]
+            data[key] = [self._ref(v) for v in value] if isinstance(value, list) else self._ref(value)
+        if isinstance(data.get("subjectConfigs"), list):
+            data["subjectConfigs"] = [
+                {**cfg, "subjectId": self._ref(cfg.get("subjectId"))} if isinstance(cfg, dict) else cfg
+                for cfg in data["subjectConfigs"]
+            ]
+        return data
+
+    def _target_id(self, index, operation):
+        target = self._ref(operation.get("id"))
+        try:
+            return int(target)
+        except (TypeError, ValueError):
+            raise BatchError(index, "id noto'g'ri")
+
+    def _remember(self, index, operation, obj, data):
+        temp_id = operation.get("tempId")
+        if temp_id:
+            self.temp_ids[str(temp_id)] = obj.id
+        self.results[index] = {"index": index, "op": operation["op"], "type": operation["type"], "id": obj.id, "data": data}
+        if temp_id:
+            self.results[index]["tempId"] = temp_id
+
+    def _validated(self, index, serializer):
+        if not serializer.is_valid():
+            raise BatchError(index, serializer.errors)
+        return serializer
+
+    def run(self, operations):
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            raise BatchError(None, f"Bir so'rovda ko'pi bilan {BATCH_MAX_OPERATIONS} ta amal")
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or operation.get("op") not in {"create", "update", "delete"}:
+                raise BatchError(index, "op create|update|delete bo'lishi kerak")
+            if operation.get("type") not in BATCH_TYPES:
+                raise BatchError(index, f"type {', '.join(BATCH_TYPES)} dan biri bo'lishi kerak")
+
+        with transaction.atomic():
+            for run in _runs(operations):
+                op, kind = run[0][1]["op"], run[0][1]["type"]
+                if op == "delete":
+                    self._delete(kind, run)
+                elif op == "update":
+                    self._update(kind, run)
+                elif kind in BULK_CREATE_TYPES:
+                    self._bulk_create(kind, run)
+                else:
+                    self._create(kind, run)
+        return [self.results[i] for i in range(len(operations))]
+
+    def _create(self, kind, run):
+        _, serializer_class = BATCH_TYPES[kind]
+        for index, operation in run:
+            serializer = self._validated(index, serializer_class(data=self._resolve(operation.get("data") or {})))
+            obj = serializer.save()
+            self._remember(index, operation, obj, serializer_class(obj).data)
+
+    def _bulk_create(self, kind, run):
+        model, serializer_class = BATCH_TYPES[kind]
+        values = [
+            dict(self._validated(index, serializer_class(data=self._resolve(operation.get("data") or {}))).validated_data)
+            for index, operation in run
+        ]
+        if kind == "question":
+            subject_ids = {v["subject_id"] for v in values}
+            existing = set(Subject.objects.filter(id__in=subject_ids).values_list("id", flat=True))
+            for (index, _), v in zip(run, values):
+                if v["subject_id"] not in existing:
+                    raise BatchError(index, {"subjectId": ["Fan topilmadi"]})
+            # Importing a question that already exists (same content hash) updates it instead of duplicating it.
+            objs, created, updated = upsert_questions(values)
+            get_search_backend().index(created + updated)
+        else:
+            objs = model.objects.bulk_create([model(**v) for v in values], batch_size=500)
+        for (index, operation), obj in zip(run, objs):
+            self._remember(index, operation, obj, serializer_class(obj).data)
+
+    def _update(self, kind, run):
+        model, serializer_class = BATCH_TYPES[kind]
+        ids = [self._target_id(index, operation) for index, operation in run]
+        instances = model.objects.in_bulk(ids)
+        for (index, operation), pk in zip(run, ids):
+            instance = instances.get(pk)
+            if instance is None:
+                raise BatchError(index, "Topilmadi")
+            serializer = serializer_class(instance, data=self._resolve(operation.get("data") or {}), partial=True)
+            obj = self._validated(index, serializer).save()
+            self._remember(index, operation, obj, serializer_class(obj).data)
+
+    def _delete(self, kind, run):
+        model, _ = BATCH_TYPES[kind]
+        ids = [self._target_id(index, operation) for index, operation in run]
+        qs = model.objects.filter(id__in=ids)
+        if kind == "user":
+            qs = qs.exclude(id=self.user.id)
+        existing = set(qs.values_list("id", flat=True))
+        if kind == "user":
+            qs.delete()
+        else:
+            qs.soft_delete()
+        for (index, operation), pk in zip(run, ids):
+            self.results[index] = {"index": index, "op": "delete", "type": kind, "id": pk, "deleted": pk in existing}
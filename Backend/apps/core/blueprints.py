@@ -0,0 +1,118 @@
+import threading
+from types import MappingProxyType
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Prefetch
+
+from . import coherence
+from .coherence import versions
+from .models import Group, Module
+
+
+def module_settings(module):
+    return {
+        "pointsPerAnswer": module.points_per_answer,
+        "durationMinutes": module.duration_minutes,
+        "passingScore": module.passing_score,
+        "randomize": module.randomize,
+        "isActive": module.is_active,
+    }
+
+
+class ModuleBlueprint:
+    """Immutable, query-free view of a module as the exam endpoints need it."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "is_demo",
+        "is_active",
+        "randomize",
+        "points_per_answer",
+        "passing_score",
+        "settings",
+        "subject_configs",
+        "subject_ids",
+        "group_ids",
+    )
+
+    def __init__(self, module):
+        values = {
+            "id": module.id,
+            "name": module.name,
+            "is_demo": module.is_demo,
+            "is_active": module.is_active,
+            "randomize": module.randomize,
+            "points_per_answer": module.points_per_answer,
+            "passing_score": module.passing_score,
+            "settings": MappingProxyType(module_settings(module)),
+            "subject_configs": tuple(
+                (cfg.subject_id, cfg.question_count, tuple(sorted(cfg.difficulty_mix.items())) if cfg.difficulty_mix else None)
+                for cfg in module.subject_configs.all()
+            ),
+            "group_ids": frozenset(g.id for g in module.groups.all()),
+        }
+        values["subject_ids"] = frozenset(cfg[0] for cfg in values["subject_configs"])
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ModuleBlueprint is immutable")
+
+    def settings_payload(self):
+        return dict(self.settings)
+
+
+class BlueprintCache:
+    """
+    Per-process cache of every live module's blueprint. Writers bump the
+    shared `modules` counter; each process rebuilds lazily once the counter
+    it was built under is stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_version = None
+        self._by_id = {}
+        self._by_group = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._built_version = None
+
+    def _load(self):
+        version = versions.get(coherence.MODULES)
+        with self._lock:
+            if self._built_version == version:
+                return self._by_id, self._by_group
+        # Always from the primary: a lagging replica would pin stale data until the next write.
+        modules = Module.objects.using(DEFAULT_DB_ALIAS).prefetch_related(
+            "subject_configs",
+            Prefetch("groups", queryset=Group.objects.only("id")),
+        ).order_by("id")
+        by_id = {m.id: ModuleBlueprint(m) for m in modules}
+        by_group = {}
+        for bp in by_id.values():
+            for group_id in bp.group_ids:
+                by_group.setdefault(group_id, []).append(bp)
+        with self._lock:
+            # A bump during the build is caught on the next call: the counter moved past `version`.
+            self._by_id, self._by_group = by_id, by_group
+            self._built_version = version
+        return by_id, by_group
+
+    def get(self, module_id):
+        return self._load()[0].get(module_id)
+
+    def all(self):
+        return list(self._load()[0].values())
+
+    def for_group(self, group_id):
+        return self._load()[1].get(group_id, [])
+
+
+blueprints = BlueprintCache()
+
+
+def invalidate_blueprints(**kwargs):
+    coherence.bump(coherence.MODULES)
@@ -0,0 +1,53 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from .models import DataVersion
+
+MODULES = "modules"
+LEADERBOARD = "leaderboard"
+QUESTIONS = "questions"
+
+
+def bump(*names):
+    """
+    Increment the counters inside the caller's transaction, so other workers
+    see the new version exactly when the data it describes commits.
+    """
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        for name in names:
+            if not DataVersion.objects.using(DEFAULT_DB_ALIAS).filter(name=name).update(version=F("version") + 1):
+                DataVersion.objects.using(DEFAULT_DB_ALIAS).get_or_create(name=name)
+                DataVersion.objects.using(DEFAULT_DB_ALIAS).filter(name=name).update(version=F("version") + 1)
+    # This process need not wait for the next check to see its own write.
+    transaction.on_commit(versions.expire, using=DEFAULT_DB_ALIAS)
+
+
+class VersionWatcher:
+    """Per-process view of the counters, re-read at most every COHERENCE_CHECK_SECONDS."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._checked_at = -math.inf
+
+    def get(self, name):
+        now = time.monotonic()
+        if now - self._checked_at >= settings.COHERENCE_CHECK_SECONDS:
+            # Primary only: a replica lagging behind would hide the bump.
+            current = dict(DataVersion.objects.using(DEFAULT_DB_ALIAS).values_list("name", "version"))
+            with self._lock:
+                self._versions = current
+                self._checked_at = now
+        return self._versions.get(name, 0)
+
+    def expire(self):
+        with self._lock:
+            self._checked_at = -math.inf
+
+
+versions = VersionWatcher()
@@ -0,0 +1,99 @@
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = "replica"
+PIN_CACHE = "replica_pins"
+
+_read_alias = contextvars.ContextVar("read_alias", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    # A shared cache (settings.CACHES["replica_pins"]): the next read may land on another worker.
+    caches[PIN_CACHE].set(_pin_key(user.id), True, settings.REPLICA_STALENESS_SECONDS)
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and caches[PIN_CACHE].get(_pin_key(user.id)))
+
+
+@contextmanager
+def read_from_replica(request):
+    """Route reads to the replica unless the user wrote something within the staleness window."""
+    if not replica_configured() or request.method not in SAFE_METHODS or is_pinned(request.user):
+        yield
+        return
+    token = _read_alias.set(REPLICA_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_read(view):
+    """For function views; place it under `@api_view` so it runs after authentication."""
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        with read_from_replica(request):
+            return view(request, *args, **kwargs)
+
+    return wrapped
+
+
+class ReplicaReadMixin:
+    replica_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            self._replica_context = read_from_replica(request)
+            self._replica_context.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        context = getattr(self, "_replica_context", None)
+        if context is not None:
+            self._replica_context = None
+            context.__exit__(None, None, None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+class ReplicaPinMiddleware:
+    """After a successful write, keep the user's reads on the primary for REPLICA_STALENESS_SECONDS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user)
+        return response
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .leaderboard import rebuild_entries
+from .models import DemoAttempt, TestResult
+from .summaries import DEMO_MAX_ATTEMPTS, invalidate_summaries
+
+
+def _raw_count(participant_id, module_id):
+    return TestResult.objects.filter(participant_id=participant_id, module_id=module_id).count()
+
+
+def _initial(participant_id, module_id):
+    # Pairs from before the counter table existed start from their stored results.
+    return DemoAttempt(participant_id=participant_id, module_id=module_id, attempts=_raw_count(participant_id, module_id))
+
+
+def attempts_used(participant_id, module_id):
+    """One unique-index read once the counter row exists."""
+    attempts = DemoAttempt.objects.filter(participant_id=participant_id, module_id=module_id).values_list("attempts", flat=True).first()
+    return _raw_count(participant_id, module_id) if attempts is None else attempts
+
+
+def reserve_attempt(participant_id, module_id):
+    """
+    Count one more attempt unless the limit is reached; returns False when it is.
+    The conditional UPDATE is atomic, so concurrent submits cannot both take the last attempt.
+    """
+    counters = DemoAttempt.objects.filter(participant_id=participant_id, module_id=module_id)
+    if counters.filter(attempts__lt=DEMO_MAX_ATTEMPTS).update(attempts=F("attempts") + 1):
+        return True
+    if counters.exists():
+        return False
+    counter = _initial(participant_id, module_id)
+    if counter.attempts >= DEMO_MAX_ATTEMPTS:
+        return False
+    counter.attempts += 1
+    try:
+        with transaction.atomic():
+            counter.save()
+    except IntegrityError:
+        # A concurrent submit created the row first.
+        return reserve_attempt(participant_id, module_id)
+    return True
+
+
+def recount_attempts(module_ids=None, participant_ids=None):
+    """Reset counters to compacted + stored results, after results were edited in bulk (snapshot sync)."""
+    results = TestResult.objects.filter(module__is_demo=True)
+    counters = DemoAttempt.objects.all()
+    if module_ids is not None:
+        results = results.filter(module_id__in=module_ids)
+        counters = counters.filter(module_id__in=module_ids)
+    if participant_ids is not None:
+        results = results.filter(participant_id__in=participant_ids)
+        counters = counters.filter(participant_id__in=participant_ids)
+    raw = {
+        (row["participant_id"], row["module_id"]): row["n"]
+        for row in results.values("participant_id", "module_id").annotate(n=Count("id"))
+    }
+    existing = {(c.participant_id, c.module_id): c for c in counters}
+    changed, created = [], []
+    for key in existing.keys() | raw.keys():
+        counter = existing.get(key)
+        if counter is None:
+            created.append(DemoAttempt(participant_id=key[0], module_id=key[1], attempts=raw[key]))
+        elif counter.attempts != counter.compacted_count + raw.get(key, 0):
+            counter.attempts = counter.compacted_count + raw.get(key, 0)
+            changed.append(counter)
+    DemoAttempt.objects.bulk_update(changed, ["attempts"], batch_size=500)
+    DemoAttempt.objects.bulk_create(created, batch_size=500)
+    return len(changed) + len(created)
+
+
+def compact_demo_results(older_than_days, batch_size=1000):
+    """
+    Fold demo results older than `older_than_days` into the DemoAttempt
+    aggregates and delete the raw rows, one batch per transaction; returns rows dropped.
+    """
+    old = TestResult.objects.filter(module__is_demo=True, date__lt=timezone.now() - timedelta(days=older_than_days))
+    total = 0
+    while True:
+        batch = list(
+            old.order_by("id").values_list("id", "participant_id", "module_id", "score", "is_passed", "date")[:batch_size]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            keys = {(p, m) for _, p, m, *_ in batch}
+            counters = {
+                (c.participant_id, c.module_id): c
+                for c in DemoAttempt.objects.select_for_update().filter(
+                    participant_id__in={p for p, _ in keys}, module_id__in={m for _, m in keys}
+                )
+                if (c.participant_id, c.module_id) in keys
+            }
+            new_keys = keys - counters.keys()
+            for key in new_keys:
+                counters[key] = _initial(*key)
+            # Oldest first, so the last row folded in is the latest compacted attempt.
+            for _, participant_id, module_id, score, is_passed, date in batch:
+                counter = counters[(participant_id, module_id)]
+                counter.compacted_count += 1
+                counter.compacted_passed += int(is_passed)
+                counter.compacted_best_score = max(counter.compacted_best_score, score)
+                counter.compacted_last_score = score
+                counter.compacted_last_date = date
+            DemoAttempt.objects.bulk_create([counters[key] for key in new_keys], batch_size=500)
+            DemoAttempt.objects.bulk_update(
+                [counter for key, counter in counters.items() if key not in new_keys],
+                ["compacted_count", "compacted_passed", "compacted_best_score", "compacted_last_score", "compacted_last_date"],
+                batch_size=500,
+            )
+            TestResult.objects.filter(id__in=[row[0] for row in batch]).delete()
+            rebuild_entries(pairs={(m, p) for p, m in keys})
+            invalidate_summaries({p for p, _ in keys})
+        total += len(batch)
+    return total
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics import pack_answers, unpack_answers
+from .models import AnswerDraft
+from .writebehind import WriteBehindBuffer
+
+DRAFT_MAX_ANSWERS = 500
+
+
+def _decode(data):
+    return {int(r["question_id"]): int(r["chosen"]) for r in unpack_answers(data)}
+
+
+class DraftBuffer(WriteBehindBuffer):
+    """
+    Autosaved answer deltas, coalesced per (participant, module) and merged
+    into AnswerDraft rows every DRAFT_FLUSH_SECONDS: one read and one bulk
+    update per flush, however many autosaves arrived in between.
+
+    The row is created by `issue` when start hands out a paper. A flush only
+    updates existing rows and keeps answers to questions on the paper that
+    were saved after it was issued, so a delta still buffered in another
+    worker cannot revive a discarded draft or leak into the next attempt.
+    """
+
+    name = "draft-flush"
+
+    def merge(self, old, new):
+        return {**old, **new}
+
+    def interval(self):
+        return settings.DRAFT_FLUSH_SECONDS
+
+    def save(self, participant_id, module_id, answers):
+        """Buffer {question_id: chosen}, stamped with the time it arrived."""
+        now = timezone.now()
+        self.add((participant_id, module_id), {question_id: (chosen, now) for question_id, chosen in answers.items()})
+
+    @transaction.atomic
+    def write(self, pending):
+        stored = {
+            (draft.participant_id, draft.module_id): draft
+            for draft in AnswerDraft.objects.select_for_update()
+            .filter(participant_id__in={p for p, _ in pending}, module_id__in={m for _, m in pending})
+            .only("id", "participant_id", "module_id", "questions", "issued_at", "data")
+            if (draft.participant_id, draft.module_id) in pending
+        }
+        now = timezone.now()
+        for key, draft in stored.items():
+            paper = set(draft.questions)
+            merged = _decode(draft.data)
+            merged.update(
+                (question_id, chosen)
+                for question_id, (chosen, at) in pending[key].items()
+                if question_id in paper and at >= draft.issued_at
+            )
+            draft.data = pack_answers(merged.items())
+            draft.updated_at = now
+        AnswerDraft.objects.bulk_update(stored.values(), ["data", "updated_at"], batch_size=500)
+
+    def issue(self, participant_id, module_id, question_ids):
+        """Start a fresh draft for a newly issued paper; answers to any earlier paper are dropped."""
+        self.take([(participant_id, module_id)])
+        AnswerDraft.objects.update_or_create(
+            participant_id=participant_id,
+            module_id=module_id,
+            defaults={"questions": list(question_ids), "issued_at": timezone.now(), "data": pack_answers([])},
+        )
+
+    def load(self, participant_id, module_id):
+        """
+        (issued question ids, {question_id: chosen}) from the stored draft plus
+        this process's unflushed delta; (None, {}) when no paper is open.
+        """
+        self.flush([(participant_id, module_id)])
+        row = AnswerDraft.objects.filter(participant_id=participant_id, module_id=module_id).values_list("questions", "data").first()
+        if row is None or not row[0]:
+            return None, {}
+        paper = row[0]
+        issued = set(paper)
+        return paper, {question_id: chosen for question_id, chosen in _decode(row[1]).items() if question_id in issued}
+
+    def discard(self, participant_id, module_id):
+        self.take([(participant_id, module_id)])
+        AnswerDraft.objects.filter(participant_id=participant_id, module_id=module_id).delete()
+
+
+drafts = DraftBuffer()
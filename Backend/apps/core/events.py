@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+from collections import Counter
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def encode_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n".encode()
+
+
+def _offer(queue, message):
+    # Slow consumers lose their oldest messages instead of growing without bound.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class EventBus:
+    """
+    In-process fan-out of exam events to SSE subscribers.
+    Publishers may run in any thread; each message is encoded once and handed
+    to every subscriber's event loop. Counts are per process and reset on restart.
+    """
+
+    def __init__(self, queue_size=200):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._started = Counter()
+        self._submitted = Counter()
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def publish(self, event, data):
+        message = encode_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                self.unsubscribe(queue)
+
+    def _count_row(self, key):
+        module_id, group_id = key
+        return {
+            "moduleId": module_id,
+            "groupId": group_id,
+            "started": self._started[key],
+            "submitted": self._submitted[key],
+        }
+
+    def counts(self):
+        with self._lock:
+            keys = sorted(set(self._started) | set(self._submitted), key=lambda k: (k[0], k[1] or 0))
+            return [self._count_row(key) for key in keys]
+
+    def session_started(self, module_id, group_id):
+        key = (module_id, group_id)
+        with self._lock:
+            self._started[key] += 1
+            row = self._count_row(key)
+        self.publish("counts", [row])
+
+    def result_created(self, result_data):
+        key = (result_data["moduleId"], result_data["groupId"])
+        with self._lock:
+            self._submitted[key] += 1
+            row = self._count_row(key)
+        self.publish("result", result_data)
+        self.publish("counts", [row])
+
+
+bus = EventBus()
@@ -0,0 +1,173 @@
+"""
+Read-only fast path for large lists. Each mapper reads `values_list` tuples and
+builds the same dicts as the matching ModelSerializer, without per-row field
+machinery. FastSerializerTests in apps/core/tests.py compares the two.
+"""
+
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .models import Module, ModuleSubjectConfig
+
+_datetime = serializers.DateTimeField().to_representation
+
+
+def _optional_datetime(value):
+    return None if value is None else _datetime(value)
+
+
+class RowMapper:
+    """`fields` maps output keys to columns, in serializer field order."""
+
+    def __init__(self, fields, converters=None, related=None):
+        self.keys = tuple(fields)
+        self.columns = tuple(fields.values())
+        converters = converters or {}
+        self.converters = tuple((i, converters[column]) for i, column in enumerate(self.columns) if column in converters)
+        # key -> fn(queryset) returning {row id: value}; filled in after the main columns.
+        self.related = related or {}
+
+    def __call__(self, queryset):
+        keys, converters = self.keys, self.converters
+        rows = []
+        for values in queryset.values_list(*self.columns):
+            if converters:
+                values = list(values)
+                for i, convert in converters:
+                    values[i] = convert(values[i])
+            rows.append(dict(zip(keys, values)))
+        if rows and self.related:
+            for key, load in self.related.items():
+                by_id = load(queryset)
+                for row in rows:
+                    row[key] = by_id.get(row["id"], [])
+        return rows
+
+
+def _group_module_ids(queryset):
+    through = Module.groups.through.objects.filter(group_id__in=queryset.values("id"), module__deleted_at__isnull=True)
+    by_id = defaultdict(list)
+    for group_id, module_id in through.order_by("id").values_list("group_id", "module_id"):
+        by_id[group_id].append(module_id)
+    return by_id
+
+
+def _module_group_ids(queryset):
+    through = Module.groups.through.objects.filter(module_id__in=queryset.values("id"), group__deleted_at__isnull=True)
+    by_id = defaultdict(list)
+    for module_id, group_id in through.order_by("id").values_list("module_id", "group_id"):
+        by_id[module_id].append(group_id)
+    return by_id
+
+
+def _module_subject_configs(queryset):
+    configs = ModuleSubjectConfig.objects.filter(module_id__in=queryset.values("id")).order_by("id")
+    by_id = defaultdict(list)
+    columns = ("id", "module_id", "subject_id", "question_count", "difficulty_mix")
+    for config_id, module_id, subject_id, question_count, mix in configs.values_list(*columns):
+        by_id[module_id].append({"id": config_id, "subjectId": subject_id, "questionCount": question_count, "difficultyMix": mix})
+    return by_id
+
+
+user_rows = RowMapper(
+    {"id": "id", "fullName": "full_name", "username": "username", "workplace": "workplace", "role": "role", "groupId": "group_id"}
+)
+
+group_rows = RowMapper(
+    {"id": "id", "name": "name", "isArchived": "is_archived", "createdAt": "created_at"},
+    converters={"created_at": _datetime},
+    related={"moduleIds": _group_module_ids},
+)
+
+subject_rows = RowMapper({"id": "id", "name": "name", "isDemo": "is_demo"})
+
+_module_columns = RowMapper(
+    {
+        "id": "id",
+        "name": "name",
+        "isDemo": "is_demo",
+        "pointsPerAnswer": "points_per_answer",
+        "durationMinutes": "duration_minutes",
+        "passingScore": "passing_score",
+        "randomize": "randomize",
+        "isActive": "is_active",
+    }
+)
+_SETTINGS_KEYS = ("pointsPerAnswer", "durationMinutes", "passingScore", "randomize", "isActive")
+
+
+def module_rows(queryset):
+    rows = _module_columns(queryset)
+    if not rows:
+        return rows
+    group_ids = _module_group_ids(queryset)
+    configs = _module_subject_configs(queryset)
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "isDemo": row["isDemo"],
+            "groupIds": group_ids.get(row["id"], []),
+            "subjectConfigs": configs.get(row["id"], []),
+            "settings": {key: row[key] for key in _SETTINGS_KEYS},
+        }
+        for row in rows
+    ]
+
+
+def question_rows(queryset):
+    return [
+        {"id": id_, "subjectId": subject_id, "text": text, "options": [a, b, c, d], "correctIndex": correct_index}
+        for id_, subject_id, text, a, b, c, d, correct_index in queryset.values_list(
+            "id", "subject_id", "text", "option_a", "option_b", "option_c", "option_d", "correct_index"
+        )
+    ]
+
+
+result_rows = RowMapper(
+    {
+        "id": "id",
+        "participantId": "participant_id",
+        "moduleId": "module_id",
+        "groupId": "group_id",
+        "correctAnswers": "correct_answers",
+        "totalQuestions": "total_questions",
+        "score": "score",
+        "isPassed": "is_passed",
+        "date": "date",
+        "timeTaken": "time_taken",
+    },
+    converters={"date": _optional_datetime},
+)
+
+SNAPSHOT_ROWS = {
+    "users": user_rows,
+    "groups": group_rows,
+    "subjects": subject_rows,
+    "modules": module_rows,
+    "questions": question_rows,
+    "results": result_rows,
+    "demoSubjects": subject_rows,
+    "demoModules": module_rows,
+    "demoQuestions": question_rows,
+    "demoResults": result_rows,
+}
+
+
+def snapshot_rows(payload):
+    """Fast equivalent of `SnapshotSerializer(payload).data`."""
+    return {key: mapper(payload[key]) for key, mapper in SNAPSHOT_ROWS.items()}
+
+
+class FastListMixin:
+    """Serve unpaginated `list` through `fast_rows` instead of the serializer."""
+
+    fast_rows = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_rows is None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(type(self).fast_rows(queryset))
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 100
+
+
+def request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _replay(stored, endpoint, body_hash):
+    if stored.endpoint != endpoint or stored.request_hash != body_hash:
+        return Response(
+            {"detail": "Bu Idempotency-Key boshqa so'rov uchun ishlatilgan"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response, status=stored.status_code, headers={"Idempotent-Replayed": "true"})
+
+
+def expired_before():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def idempotent(view):
+    """
+    For function views; place it under `@api_view`. With an Idempotency-Key
+    header the view runs in one transaction with the key's row, so a
+    concurrent duplicate blocks on the unique index and then replays the
+    stored response instead of running the view again. Reusing a key with a
+    different body is a 422. Only 2xx responses are kept: after an error the
+    key is released, so a corrected retry runs.
+    """
+    endpoint = view.__name__
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response({"detail": "Idempotency-Key juda uzun"}, status=status.HTTP_400_BAD_REQUEST)
+        body_hash = request_hash(request)
+
+        stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if stored is not None:
+            if stored.created_at >= expired_before():
+                return _replay(stored, endpoint, body_hash)
+            stored.delete()
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, endpoint=endpoint, request_hash=body_hash
+                )
+                response = view(request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    record.status_code = response.status_code
+                    record.response = response.data
+                    record.save(update_fields=["status_code", "response"])
+                else:
+                    record.delete()
+        except IntegrityError:
+            stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if stored is None:
+                raise
+            return _replay(stored, endpoint, body_hash)
+        return response
+
+    return wrapped
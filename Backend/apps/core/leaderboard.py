@@ -0,0 +1,196 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+
+from . import coherence
+from .coherence import LEADERBOARD, versions
+from .models import LeaderboardEntry, TestResult
+
+NO_TIME = 1 << 31
+
+
+def rank_key(score, time_taken, date, participant_id):
+    """Higher score first, then faster, then earlier; participant id breaks exact ties."""
+    return (-score, NO_TIME if time_taken is None else time_taken, date.timestamp(), participant_id)
+
+
+class Leaderboard:
+    """Sorted keys of one (module, group) board, or the whole module when group_id is None."""
+
+    def __init__(self, entries, version=0):
+        self.keys = sorted(entries.values())
+        self.by_participant = dict(entries)
+        self.loaded_at = time.monotonic()
+        self.version = version
+
+    def __len__(self):
+        return len(self.keys)
+
+    def offer(self, participant_id, key):
+        old = self.by_participant.get(participant_id)
+        if old is not None:
+            if old <= key:
+                return
+            del self.keys[bisect_left(self.keys, old)]
+        insort(self.keys, key)
+        self.by_participant[participant_id] = key
+
+    def rank(self, participant_id):
+        key = self.by_participant.get(participant_id)
+        if key is None:
+            return None
+        return bisect_left(self.keys, key) + 1
+
+    def projected(self, participant_id, key):
+        """(rank, total) as if `key` had been offered, without changing the board."""
+        old = self.by_participant.get(participant_id)
+        if old is not None and old <= key:
+            return bisect_left(self.keys, old) + 1, len(self.keys)
+        return bisect_left(self.keys, key) + 1, len(self.keys) + (old is None)
+
+    def percentile(self, rank, total=None):
+        """Share of the other participants ranked below, 0..100."""
+        n = len(self.keys) if total is None else total
+        return 100.0 if n <= 1 else round((n - rank) / (n - 1) * 100, 1)
+
+    def page(self, offset, limit):
+        return [(offset + i + 1, key) for i, key in enumerate(self.keys[offset : offset + limit])]
+
+
+class LeaderboardRegistry:
+    """
+    Boards are patched in place by this process's submits. Removals (rebuild,
+    archive, sync) bump the shared `leaderboard` counter; other workers'
+    inserts show up after LEADERBOARD_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._boards = {}
+
+    def _load(self, module_id, group_id, version):
+        qs = LeaderboardEntry.objects.filter(module_id=module_id)
+        if group_id is not None:
+            qs = qs.filter(group_id=group_id)
+        entries = {
+            participant_id: rank_key(score, time_taken, date, participant_id)
+            for participant_id, score, time_taken, date in qs.values_list("participant_id", "score", "time_taken", "date")
+        }
+        return Leaderboard(entries, version)
+
+    def board(self, module_id, group_id=None):
+        key = (module_id, group_id)
+        version = versions.get(LEADERBOARD)
+        with self._lock:
+            board = self._boards.get(key)
+            if (
+                board is None
+                or board.version != version
+                or time.monotonic() - board.loaded_at > settings.LEADERBOARD_TTL_SECONDS
+            ):
+                board = self._boards[key] = self._load(module_id, group_id, version)
+            return board
+
+    def record(self, result):
+        """
+        Upsert the participant's best entry; the in-memory boards follow once
+        the caller's transaction commits. Returns the result's rank key.
+        """
+        key = rank_key(result.score, result.time_taken, result.date, result.participant_id)
+        entry = LeaderboardEntry.objects.filter(module_id=result.module_id, participant_id=result.participant_id).first()
+        if entry is None or key < rank_key(entry.score, entry.time_taken, entry.date, entry.participant_id):
+            LeaderboardEntry.objects.update_or_create(
+                module_id=result.module_id,
+                participant_id=result.participant_id,
+                defaults={
+                    "group_id": result.group_id,
+                    "result_id": result.id,
+                    "score": result.score,
+                    "time_taken": result.time_taken,
+                    "date": result.date,
+                },
+            )
+        transaction.on_commit(lambda: self._offer(result.module_id, result.group_id, result.participant_id, key))
+        return key
+
+    def _offer(self, module_id, group_id, participant_id, key):
+        with self._lock:
+            for board_group_id in {group_id, None}:
+                self.board(module_id, board_group_id).offer(participant_id, key)
+
+    def standing(self, module_id, group_id, participant_id, key=None):
+        """Rank on the (module, group) board; with `key`, as if that result were already on it."""
+        with self._lock:
+            board = self.board(module_id, group_id)
+            if key is not None:
+                rank, total = board.projected(participant_id, key)
+            else:
+                rank, total = board.rank(participant_id), len(board)
+            if rank is None:
+                return None
+            return {"rank": rank, "total": total, "percentile": board.percentile(rank, total)}
+
+    def invalidate(self):
+        with self._lock:
+            self._boards.clear()
+
+
+leaderboards = LeaderboardRegistry()
+
+
+def rebuild_entries(module_ids=None, pairs=None):
+    """
+    Reset LeaderboardEntry rows to each participant's best remaining result:
+    for `pairs` [(module_id, participant_id)] only, else for `module_ids`,
+    else everywhere. Call after deleting or editing results. Returns the
+    number of entries written.
+    """
+    results = TestResult.objects.all()
+    entries = LeaderboardEntry.objects.all()
+    if module_ids is not None:
+        results = results.filter(module_id__in=module_ids)
+        entries = entries.filter(module_id__in=module_ids)
+    if pairs is not None:
+        pairs = set(pairs)
+        if not pairs:
+            return 0
+        results = results.filter(module_id__in={m for m, _ in pairs}, participant_id__in={p for _, p in pairs})
+        entries = entries.filter(module_id__in={m for m, _ in pairs}, participant_id__in={p for _, p in pairs})
+
+    best = {}
+    fields = ("id", "module_id", "group_id", "participant_id", "score", "time_taken", "date")
+    for row in results.values_list(*fields).iterator(chunk_size=5000):
+        result_id, module_id, group_id, participant_id, score, time_taken, date = row
+        if pairs is not None and (module_id, participant_id) not in pairs:
+            continue
+        key = rank_key(score, time_taken, date, participant_id)
+        current = best.get((module_id, participant_id))
+        if current is None or key < current[0]:
+            best[(module_id, participant_id)] = (key, row)
+
+    with transaction.atomic():
+        if pairs is None:
+            entries.delete()
+        else:
+            stale = [pk for pk, m, p in entries.values_list("id", "module_id", "participant_id") if (m, p) in pairs]
+            LeaderboardEntry.objects.filter(id__in=stale).delete()
+        LeaderboardEntry.objects.bulk_create(
+            [
+                LeaderboardEntry(
+                    result_id=row[0],
+                    module_id=row[1],
+                    group_id=row[2],
+                    participant_id=row[3],
+                    score=row[4],
+                    time_taken=row[5],
+                    date=row[6],
+                )
+                for _, row in best.values()
+            ],
+            batch_size=1000,
+        )
+        coherence.bump(LEADERBOARD)
+    return len(best)
@@ -0,0 +1,289 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import AnswerDraft, Module, TestResult
+
+MAINTENANCE_APPS = ("accounts", "core")
+POSTGRES_LOCK_KEY = 0x61727465  # pg_try_advisory_lock key shared by every db_maintenance run
+
+
+def core_tables():
+    """Tables of our own apps, including auto-created M2M tables."""
+    return sorted(
+        model._meta.db_table
+        for label in MAINTENANCE_APPS
+        for model in apps.get_app_config(label).get_models(include_auto_created=True)
+    )
+
+
+def active_exam_windows(now=None):
+    """
+    Modules someone may still be answering: a draft was autosaved or a result
+    submitted within the module's duration plus DB_MAINTENANCE_GRACE_MINUTES.
+    Returns [(module, last activity)].
+    """
+    now = now or timezone.now()
+    grace = timedelta(minutes=settings.DB_MAINTENANCE_GRACE_MINUTES)
+    modules = {m.id: m for m in Module.objects.filter(is_active=True)}
+    if not modules:
+        return []
+    since = now - grace - timedelta(minutes=max(m.duration_minutes for m in modules.values()))
+
+    last = {}
+    for qs, column in ((AnswerDraft.objects, "updated_at"), (TestResult.objects, "date")):
+        rows = qs.filter(module_id__in=modules, **{f"{column}__gte": since}).values("module_id").annotate(last=Max(column))
+        for row in rows:
+            last[row["module_id"]] = max(last.get(row["module_id"], row["last"]), row["last"])
+
+    return [
+        (modules[module_id], at)
+        for module_id, at in sorted(last.items())
+        if at >= now - grace - timedelta(minutes=modules[module_id].duration_minutes)
+    ]
+
+
+def _try_lock(f):
+    """Non-blocking exclusive lock on an open file; False when another process holds it."""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock(f):
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SQLiteMaintenance:
+    def __init__(self, busy_timeout_ms=None):
+        self.busy_timeout_ms = busy_timeout_ms
+
+    @contextmanager
+    def lock(self):
+        """Yields False when another db_maintenance run holds the lock."""
+        with open(f"{settings.DATABASES['default']['NAME']}.maintenance.lock", "w") as f:
+            if not _try_lock(f):
+                yield False
+                return
+            try:
+                if self.busy_timeout_ms is not None:
+                    # Give up on a step instead of queueing behind exam writes for the full busy_timeout.
+                    self._execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+                yield True
+            finally:
+                if self.busy_timeout_ms is not None:
+                    self._execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+                _unlock(f)
+
+    def _execute(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else []
+
+    def _pragma(self, name):
+        return self._execute(f"PRAGMA {name}")[0][0]
+
+    def analyze(self):
+        # analysis_limit bounds the rows sampled per index, so big tables don't hold the lock for long.
+        self._execute(f"PRAGMA analysis_limit={settings.DB_MAINTENANCE_ANALYSIS_LIMIT}")
+        self._execute("ANALYZE")
+        self._execute("PRAGMA optimize")
+        return "ANALYZE + PRAGMA optimize"
+
+    def vacuum(self, pages):
+        details = []
+        # FTS5 segments left by row deletes/updates are merged in place.
+        for (table,) in self._execute("SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE '%USING fts5%'"):
+            self._execute(f'INSERT INTO "{table}"("{table}") VALUES (\'optimize\')')
+            details.append(f"{table} optimize")
+
+        free = self._pragma("freelist_count")
+        if self._pragma("auto_vacuum") != 2:
+            details.append(f"{free} bo'sh sahifa; auto_vacuum INCREMENTAL emas (--enable-incremental-vacuum)")
+        else:
+            released = 0
+            # Small steps: each is its own short write transaction.
+            while free > 0:
+                self._execute(f"PRAGMA incremental_vacuum({pages})")
+                left = self._pragma("freelist_count")
+                released += free - left
+                if left >= free:
+                    break
+                free = left
+            details.append(f"{released} sahifa bo'shatildi")
+        self._execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return "; ".join(details)
+
+    def enable_incremental_vacuum(self):
+        # auto_vacuum only changes through a full VACUUM, which rewrites the whole file.
+        self._execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._execute("VACUUM")
+        return f"auto_vacuum={self._pragma('auto_vacuum')}"
+
+    def integrity(self, full=False):
+        problems = [row[0] for row in self._execute("PRAGMA integrity_check" if full else "PRAGMA quick_check")]
+        problems = [p for p in problems if p != "ok"]
+        problems += [f"foreign key: {table} rowid={rowid} -> {parent}" for table, rowid, parent, _ in self._execute("PRAGMA foreign_key_check")]
+        return problems
+
+    def _row_estimates(self):
+        # After ANALYZE, the first number of each sqlite_stat1 row is the table's row count.
+        if not self._execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"):
+            return {}
+        return {tbl: int(stat.split()[0]) for tbl, stat in self._execute("SELECT tbl, stat FROM sqlite_stat1")}
+
+    def table_sizes(self):
+        tables = core_tables()
+        indexes = {}
+        for name, table in self._execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'"):
+            indexes[name] = table
+        pages = dict(self._execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+        rows = self._row_estimates()
+        report = []
+        for table in tables:
+            index_bytes = sum(size for name, size in pages.items() if indexes.get(name) == table)
+            report.append(
+                {"table": table, "rows": rows.get(table), "tableBytes": pages.get(table, 0), "indexBytes": index_bytes}
+            )
+        page_size = self._pragma("page_size")
+        totals = {
+            "fileBytes": self._pragma("page_count") * page_size,
+            "freeBytes": self._pragma("freelist_count") * page_size,
+        }
+        return report, totals
+
+    def index_stats(self):
+        """SQLite keeps no usage counters: report size and selectivity (rows per key) from sqlite_stat1."""
+        tables = set(core_tables())
+        pages = dict(self._execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+        stats = {}
+        if self._execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"):
+            stats = {idx: stat for idx, stat in self._execute("SELECT idx, stat FROM sqlite_stat1 WHERE idx IS NOT NULL")}
+        report = []
+        for name, table in self._execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' ORDER BY tbl_name, name"):
+            if table not in tables:
+                continue
+            stat = stats.get(name, "").split()
+            report.append(
+                {
+                    "table": table,
+                    "index": name,
+                    "bytes": pages.get(name, 0),
+                    "rowsPerKey": int(stat[1]) if len(stat) > 1 else None,
+                    "scans": None,
+                }
+            )
+        return report
+
+
+class PostgresMaintenance:
+    def __init__(self, busy_timeout_ms=None):
+        self.busy_timeout_ms = busy_timeout_ms
+
+    @contextmanager
+    def lock(self):
+        (acquired,) = self._execute("SELECT pg_try_advisory_lock(%s)", [POSTGRES_LOCK_KEY])[0]
+        if not acquired:
+            yield False
+            return
+        try:
+            if self.busy_timeout_ms is not None:
+                self._execute(f"SET lock_timeout = {int(self.busy_timeout_ms)}")
+            yield True
+        finally:
+            if self.busy_timeout_ms is not None:
+                self._execute("RESET lock_timeout")
+            self._execute("SELECT pg_advisory_unlock(%s)", [POSTGRES_LOCK_KEY])
+
+    def _execute(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else []
+
+    def analyze(self):
+        qn = connection.ops.quote_name
+        for table in core_tables():
+            self._execute(f"ANALYZE {qn(table)}")
+        return f"{len(core_tables())} ta jadval ANALYZE"
+
+    def vacuum(self, pages):
+        # Plain VACUUM never takes an exclusive lock; `pages` only applies to SQLite.
+        qn = connection.ops.quote_name
+        for table in core_tables():
+            self._execute(f"VACUUM (ANALYZE) {qn(table)}")
+        return f"{len(core_tables())} ta jadval VACUUM (ANALYZE)"
+
+    def enable_incremental_vacuum(self):
+        return "PostgreSQL: autovacuum ishlatiladi"
+
+    def integrity(self, full=False):
+        if not self._execute("SELECT 1 FROM pg_extension WHERE extname = 'amcheck'"):
+            return []
+        rows = self._execute(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_class t ON t.oid = i.indrelid JOIN pg_am a ON a.oid = c.relam "
+            "WHERE a.amname = 'btree' AND t.relname = ANY(%s)",
+            [core_tables()],
+        )
+        problems = []
+        for (index,) in rows:
+            try:
+                self._execute("SELECT bt_index_check(%s::regclass, %s)", [index, full])
+            except Exception as exc:
+                problems.append(f"{index}: {exc}")
+        return problems
+
+    def table_sizes(self):
+        rows = self._execute(
+            "SELECT relname, n_live_tup, n_dead_tup, pg_relation_size(relid), pg_indexes_size(relid) "
+            "FROM pg_stat_user_tables WHERE relname = ANY(%s) ORDER BY relname",
+            [core_tables()],
+        )
+        report = [
+            {"table": table, "rows": live, "deadRows": dead, "tableBytes": size, "indexBytes": index_size}
+            for table, live, dead, size, index_size in rows
+        ]
+        return report, {"fileBytes": self._execute("SELECT pg_database_size(current_database())")[0][0]}
+
+    def index_stats(self):
+        rows = self._execute(
+            "SELECT relname, indexrelname, pg_relation_size(indexrelid), idx_scan "
+            "FROM pg_stat_user_indexes WHERE relname = ANY(%s) ORDER BY relname, indexrelname",
+            [core_tables()],
+        )
+        return [
+            {"table": table, "index": index, "bytes": size, "rowsPerKey": None, "scans": scans}
+            for table, index, size, scans in rows
+        ]
+
+
+def get_maintenance(busy_timeout_ms=None):
+    if connection.vendor == "sqlite":
+        return SQLiteMaintenance(busy_timeout_ms)
+    return PostgresMaintenance(busy_timeout_ms)
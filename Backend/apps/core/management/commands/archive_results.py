@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.archive import archive_results
+from apps.core.models import TestResult
+
+
+class Command(BaseCommand):
+    help = "Move results of archived groups and/or older results into compressed archive files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--archived-groups", action="store_true", help="Results of groups with is_archived=True")
+        parser.add_argument("--older-than-days", type=int, help="Results submitted before this many days ago")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        condition = Q()
+        if options["archived_groups"]:
+            condition |= Q(group__is_archived=True)
+        if options["older_than_days"] is not None:
+            condition |= Q(date__lt=timezone.now() - timedelta(days=options["older_than_days"]))
+        if not condition:
+            raise CommandError("--archived-groups yoki --older-than-days kerak")
+
+        file_name, total = archive_results(TestResult.objects.filter(condition), batch_size=max(1, options["batch_size"]))
+        if not total:
+            self.stdout.write("Arxivlanadigan natija yo'q")
+            return
+        self.stdout.write(self.style.SUCCESS(f"{total} natija -> {file_name}"))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.demo_attempts import compact_demo_results, recount_attempts
+
+
+class Command(BaseCommand):
+    help = "Fold old demo results into per-participant attempt aggregates and delete the raw rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None, help="Default: DEMO_RESULT_RETENTION_DAYS")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--recount", action="store_true", help="Only reset attempt counters from stored results")
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            self.stdout.write(self.style.SUCCESS(f"{recount_attempts()} ta hisoblagich yangilandi"))
+            return
+        days = options["older_than_days"]
+        if days is None:
+            days = settings.DEMO_RESULT_RETENTION_DAYS
+        total = compact_demo_results(days, batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"{total} ta demo natija siqildi"))
@@ -0,0 +1,110 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.utils import timezone
+
+from apps.core.maintenance import active_exam_windows, get_maintenance
+
+STEPS = ("analyze", "vacuum", "integrity", "report")
+
+
+def _size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class Command(BaseCommand):
+    help = "ANALYZE, incremental VACUUM, integrity check and size/index reports for the database"
+
+    def add_arguments(self, parser):
+        for step in STEPS:
+            parser.add_argument(f"--{step}", action="store_true", help="Only the chosen steps (default: all)")
+        parser.add_argument("--full-integrity", action="store_true", help="integrity_check instead of quick_check")
+        parser.add_argument("--vacuum-pages", type=int, default=1000, help="Pages released per incremental step")
+        parser.add_argument(
+            "--enable-incremental-vacuum", action="store_true", help="One-off full VACUUM switching SQLite to auto_vacuum=INCREMENTAL"
+        )
+        parser.add_argument(
+            "--scheduled",
+            action="store_true",
+            help="For cron: skip while any module's exam window is open or another run holds the lock",
+        )
+        parser.add_argument("--force", action="store_true", help="Ignore open exam windows")
+
+    def handle(self, *args, **options):
+        steps = [step for step in STEPS if options[step]] or list(STEPS)
+        scheduled = options["scheduled"]
+
+        if not options["force"]:
+            windows = active_exam_windows()
+            for module, at in windows:
+                self.stdout.write(f"Imtihon davom etmoqda: {module.name} (#{module.id}), oxirgi faollik {timezone.localtime(at):%H:%M:%S}")
+            if windows:
+                if scheduled:
+                    self.stdout.write(self.style.WARNING("O'tkazib yuborildi: imtihon oynasi ochiq"))
+                    return
+                raise CommandError("Imtihon oynasi ochiq; --force bilan majburan ishga tushiring")
+
+        maintenance = get_maintenance(settings.DB_MAINTENANCE_BUSY_TIMEOUT_MS if scheduled else None)
+        with maintenance.lock() as acquired:
+            if not acquired:
+                if scheduled:
+                    self.stdout.write(self.style.WARNING("O'tkazib yuborildi: boshqa db_maintenance ishlayapti"))
+                    return
+                raise CommandError("Boshqa db_maintenance ishlayapti")
+            try:
+                self._run(maintenance, steps, options)
+            except OperationalError as exc:
+                # With --scheduled the busy timeout is short: yield to the app and retry next run.
+                if scheduled:
+                    self.stdout.write(self.style.WARNING(f"To'xtatildi, baza band: {exc}"))
+                    return
+                raise
+
+    def _step(self, name, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        ms = (time.perf_counter() - started) * 1000
+        detail = result if isinstance(result, str) else f"{len(result)} ta muammo"
+        self.stdout.write(f"{name:<12} {ms:>9.1f} ms  {detail}")
+        return result
+
+    def _run(self, maintenance, steps, options):
+        if options["enable_incremental_vacuum"]:
+            self._step("autoVacuum", maintenance.enable_incremental_vacuum)
+        if "analyze" in steps:
+            self._step("analyze", maintenance.analyze)
+        if "vacuum" in steps:
+            self._step("vacuum", maintenance.vacuum, max(1, options["vacuum_pages"]))
+
+        problems = []
+        if "integrity" in steps:
+            problems = self._step("integrity", maintenance.integrity, options["full_integrity"])
+            for problem in problems:
+                self.stdout.write(self.style.ERROR(f"  {problem}"))
+
+        if "report" in steps:
+            tables, totals = maintenance.table_sizes()
+            self.stdout.write(f"\n{'table':<36}{'rows':>12}{'data':>12}{'indexes':>12}")
+            for row in tables:
+                rows = "?" if row["rows"] is None else row["rows"]
+                dead = f" (+{row['deadRows']} dead)" if row.get("deadRows") else ""
+                self.stdout.write(
+                    f"{row['table']:<36}{rows:>12}{_size(row['tableBytes']):>12}{_size(row['indexBytes']):>12}{dead}"
+                )
+            self.stdout.write("  ".join(f"{key}={_size(value)}" for key, value in totals.items()))
+
+            self.stdout.write(f"\n{'index':<64}{'size':>10}{'rows/key':>10}{'scans':>10}")
+            for row in maintenance.index_stats():
+                per_key = "-" if row["rowsPerKey"] is None else row["rowsPerKey"]
+                scans = "-" if row["scans"] is None else row["scans"]
+                unused = "  unused" if row["scans"] == 0 else ""
+                self.stdout.write(f"{row['index']:<64}{_size(row['bytes']):>10}{per_key:>10}{scans:>10}{unused}")
+
+        if problems:
+            raise CommandError(f"Integrity: {len(problems)} ta muammo")
+        self.stdout.write(self.style.SUCCESS("Tayyor"))
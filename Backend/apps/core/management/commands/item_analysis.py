@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.analytics import compute_item_stats
+from apps.core.models import Module
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question difficulty, discrimination and option counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", type=int, action="append", dest="modules")
+
+    def handle(self, *args, **options):
+        modules = Module.objects.all().order_by("id")
+        if options["modules"]:
+            modules = modules.filter(id__in=options["modules"])
+
+        for module in modules:
+            started = time.perf_counter()
+            with transaction.atomic():
+                stats = compute_item_stats(module)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{module.id} {module.name}: {len(stats)} question(s) in {elapsed:.2f}s")
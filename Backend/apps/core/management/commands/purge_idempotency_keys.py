@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.idempotency import expired_before
+from apps.core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL_HOURS"
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expired_before()).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} ta kalit o'chirildi"))
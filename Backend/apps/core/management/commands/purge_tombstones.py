@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.core.models import Group, Module, Question, Subject
+
+# Children first, so cascades triggered by a parent find fewer rows left to touch.
+PURGE_ORDER = (Question, Module, Subject, Group)
+
+
+def _chunks(ids, size):
+    for i in range(0, len(ids), size):
+        yield ids[i : i + size]
+
+
+def _purge_ids(cursor, model, ids):
+    """Set-based equivalent of Django's deletion collector for `ids` of `model`."""
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(ids))
+    for field in model._meta.local_many_to_many:
+        if field.remote_field.through._meta.auto_created:
+            table = qn(field.remote_field.through._meta.db_table)
+            cursor.execute(f"DELETE FROM {table} WHERE {qn(field.m2m_column_name())} IN ({placeholders})", ids)
+
+    for rel in model._meta.related_objects:
+        if rel.many_to_many:
+            if rel.through._meta.auto_created:
+                table = qn(rel.through._meta.db_table)
+                cursor.execute(f"DELETE FROM {table} WHERE {qn(rel.field.m2m_reverse_name())} IN ({placeholders})", ids)
+            continue
+
+        child = rel.related_model
+        table = qn(child._meta.db_table)
+        column = qn(rel.field.column)
+        if rel.on_delete is models.SET_NULL:
+            cursor.execute(f"UPDATE {table} SET {column} = NULL WHERE {column} IN ({placeholders})", ids)
+        elif rel.on_delete is models.CASCADE:
+            if child._meta.related_objects:
+                cursor.execute(f"SELECT {qn(child._meta.pk.column)} FROM {table} WHERE {column} IN ({placeholders})", ids)
+                child_ids = [row[0] for row in cursor.fetchall()]
+                for chunk in _chunks(child_ids, len(ids)):
+                    _purge_ids(cursor, child, chunk)
+            else:
+                cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", ids)
+
+    pk = qn(model._meta.pk.column)
+    cursor.execute(f"DELETE FROM {qn(model._meta.db_table)} WHERE {pk} IN ({placeholders})", ids)
+
+
+class Command(BaseCommand):
+    help = "Hard-delete tombstoned groups, subjects, modules and questions in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=7)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        batch_size = max(1, options["batch_size"])
+
+        for model in PURGE_ORDER:
+            tombstones = model.all_objects.filter(deleted_at__isnull=False, deleted_at__lt=cutoff)
+            if options["dry_run"]:
+                self.stdout.write(f"{model.__name__}: {tombstones.count()} tombstone(s)")
+                continue
+
+            purged = 0
+            while True:
+                ids = list(tombstones.order_by("id").values_list("id", flat=True)[:batch_size])
+                if not ids:
+                    break
+                with transaction.atomic(), connection.cursor() as cursor:
+                    _purge_ids(cursor, model, ids)
+                purged += len(ids)
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__}: purged {purged}"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.leaderboard import rebuild_entries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the leaderboard rank table from stored results"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", type=int, action="append", dest="modules")
+
+    def handle(self, *args, **options):
+        written = rebuild_entries(module_ids=options["modules"] or None)
+        self.stdout.write(self.style.SUCCESS(f"{written} ta yozuv"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the participant dashboard summaries from stored results"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participant", type=int, action="append", dest="participants")
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries(options["participants"])
+        self.stdout.write(self.style.SUCCESS(f"{count} ta ishtirokchi"))
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.analytics import compute_question_difficulty
+from apps.core.sampling import invalidate_question_pools
+
+
+class Command(BaseCommand):
+    help = "Recount per-question answer totals used for difficulty-stratified sampling"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            count = compute_question_difficulty()
+            invalidate_question_pools()
+        self.stdout.write(self.style.SUCCESS(f"{count} question(s) in {time.perf_counter() - started:.2f}s"))
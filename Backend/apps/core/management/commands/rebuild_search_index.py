@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.directory import get_user_directory
+from apps.core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the question and user directory search indexes from their tables"
+
+    def handle(self, *args, **options):
+        for backend in (get_search_backend(), get_user_directory()):
+            backend.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"{type(backend).__name__}: index rebuilt"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.models import Question
+
+
+class Command(BaseCommand):
+    help = "Recompute Question.content_hash (e.g. for rows created before the column existed)"
+
+    def handle(self, *args, **options):
+        changed = []
+        total = 0
+        for question in Question.all_objects.only("id", "subject_id", "text", "option_a", "option_b", "option_c", "option_d", "content_hash").iterator(chunk_size=2000):
+            total += 1
+            old = question.content_hash
+            if question.refresh_content_hash() != old:
+                changed.append(question)
+            if len(changed) >= 2000:
+                Question.all_objects.bulk_update(changed, ["content_hash"])
+                changed = []
+        Question.all_objects.bulk_update(changed, ["content_hash"])
+        self.stdout.write(self.style.SUCCESS(f"{total} ta savol tekshirildi"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.archive import restore_archive
+
+
+class Command(BaseCommand):
+    help = "Restore archived results from an archive file back into the results table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("file_name")
+        parser.add_argument("--module", type=int)
+        parser.add_argument("--group", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            restored, skipped = restore_archive(options["file_name"], module_id=options["module"], group_id=options["group"])
+        except FileNotFoundError:
+            raise CommandError(f"Arxiv topilmadi: {options['file_name']}")
+        self.stdout.write(self.style.SUCCESS(f"Tiklandi: {restored}, o'tkazib yuborildi: {skipped}"))
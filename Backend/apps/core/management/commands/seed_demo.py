@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 
 from apps.accounts.models import User, UserRole
 from apps.core.models import Group, Module, ModuleSubjectConfig, Question, Subject
+from apps.core.search import get_search_backend
 
 
 class Command(BaseCommand):
@@ -40,18 +41,20 @@ class Command(BaseCommand):
         demo_module.groups.add(group)
         ModuleSubjectConfig.objects.create(module=demo_module, subject=demo_subj, question_count=3)
 
-        Question.objects.bulk_create(
-            [
-                Question(subject=subj, text="Guanash bo'yog'i qanday asosga ega?", option_a="Suv", option_b="Moy", option_c="Sirt", option_d="Lola", correct_index=0),
-                Question(subject=subj, text="Kompozitsiya qonuniyatlariga nima kirmaydi?", option_a="Yaxlitlik", option_b="Mantiqsizlik", option_c="Kontrast", option_d="Muvozanat", correct_index=1),
-                Question(subject=subj, text="Asosiy ranglar necha xil?", option_a="2 ta", option_b="3 ta", option_c="5 ta", option_d="7 ta", correct_index=1),
-                Question(subject=subj, text="Akvarel texnikasida eng muhim vosita nima?", option_a="Loyiha", option_b="Qalam", option_c="Suv", option_d="Yog'", correct_index=2),
-                Question(subject=subj, text="Portret janri nimani tasvirlaydi?", option_a="Tabiatni", option_b="Hayvonlarni", option_c="Insonni", option_d="Binolarni", correct_index=2),
-                Question(subject=demo_subj, text="Sariq va ko'k aralashsa qaysi rang hosil bo'ladi?", option_a="Yashil", option_b="Qizil", option_c="Binafsha", option_d="Qora", correct_index=0),
-                Question(subject=demo_subj, text="Kontrast nimani anglatadi?", option_a="Bir xil ranglar", option_b="Farqli elementlar kuchi", option_c="Faqat qora rang", option_d="Faqat oq rang", correct_index=1),
-                Question(subject=demo_subj, text="Kompozitsiyada muvozanat nima?", option_a="Tasodifiy joylashuv", option_b="Elementlar uyg'unligi", option_c="Faqat markaz", option_d="Rangsizlik", correct_index=1),
-            ]
-        )
+        questions = [
+            Question(subject=subj, text="Guanash bo'yog'i qanday asosga ega?", option_a="Suv", option_b="Moy", option_c="Sirt", option_d="Lola", correct_index=0),
+            Question(subject=subj, text="Kompozitsiya qonuniyatlariga nima kirmaydi?", option_a="Yaxlitlik", option_b="Mantiqsizlik", option_c="Kontrast", option_d="Muvozanat", correct_index=1),
+            Question(subject=subj, text="Asosiy ranglar necha xil?", option_a="2 ta", option_b="3 ta", option_c="5 ta", option_d="7 ta", correct_index=1),
+            Question(subject=subj, text="Akvarel texnikasida eng muhim vosita nima?", option_a="Loyiha", option_b="Qalam", option_c="Suv", option_d="Yog'", correct_index=2),
+            Question(subject=subj, text="Portret janri nimani tasvirlaydi?", option_a="Tabiatni", option_b="Hayvonlarni", option_c="Insonni", option_d="Binolarni", correct_index=2),
+            Question(subject=demo_subj, text="Sariq va ko'k aralashsa qaysi rang hosil bo'ladi?", option_a="Yashil", option_b="Qizil", option_c="Binafsha", option_d="Qora", correct_index=0),
+            Question(subject=demo_subj, text="Kontrast nimani anglatadi?", option_a="Bir xil ranglar", option_b="Farqli elementlar kuchi", option_c="Faqat qora rang", option_d="Faqat oq rang", correct_index=1),
+            Question(subject=demo_subj, text="Kompozitsiyada muvozanat nima?", option_a="Tasodifiy joylashuv", option_b="Elementlar uyg'unligi", option_c="Faqat markaz", option_d="Rangsizlik", correct_index=1),
+        ]
+        for question in questions:
+            question.refresh_content_hash()
+        Question.objects.bulk_create(questions)
+        get_search_backend().index(questions)
 
         admin = User.objects.create_superuser(username="admin", password="123", email="admin@example.com")
         admin.full_name = "Admin User"
@@ -0,0 +1,207 @@
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import User, UserRole
+from apps.core.models import Group, Module, TestResult
+from apps.core.services import delete_results
+
+PHASES = ("login", "available", "start", "submit")
+PASSWORD = "load-123"
+_DB_TIMING_RE = re.compile(r"db;dur=([\d.]+)")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class PhaseStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.db_ms = defaultdict(float)
+        self.errors = defaultdict(int)
+        self.lock_timeouts = defaultdict(int)
+        self.window = {}
+
+    def record(self, phase, started, elapsed, status_code, body, headers):
+        match = _DB_TIMING_RE.search(headers.get("Server-Timing", "") if headers else "")
+        with self.lock:
+            self.latencies[phase].append(elapsed)
+            first, last = self.window.get(phase, (started, started + elapsed))
+            self.window[phase] = (min(first, started), max(last, started + elapsed))
+            if match:
+                self.db_ms[phase] += float(match.group(1))
+            if status_code >= 400:
+                self.errors[phase] += 1
+                if b"database is locked" in body or b"database table is locked" in body:
+                    self.lock_timeouts[phase] += 1
+
+
+class Command(BaseCommand):
+    help = "Simulate a wave of participants logging in, starting and submitting an exam concurrently"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participants", type=int, default=200)
+        parser.add_argument("--groups", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--module", type=int, help="Main module id; defaults to the first active main module")
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000/api")
+        parser.add_argument("--launch", action="store_true", help="Start a local runserver with Server-Timing enabled")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--ramp-seconds", type=float, default=5.0)
+        parser.add_argument("--think-seconds", type=float, default=0.2, help="Mean think time per question")
+        parser.add_argument("--prefix", default="load_user_")
+
+    def handle(self, *args, **options):
+        module = self._resolve_module(options["module"])
+        self._seed(module, options)
+
+        server = None
+        base_url = options["base_url"].rstrip("/")
+        if options["launch"]:
+            server, base_url = self._launch(options["port"])
+        try:
+            stats = PhaseStats()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                for i in range(options["participants"]):
+                    pool.submit(self._participant, base_url, f"{options['prefix']}{i}", module.id, stats, options)
+            wall = time.perf_counter() - started
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=10)
+
+        self._report(stats, wall)
+
+    def _resolve_module(self, module_id):
+        qs = Module.objects.filter(is_demo=False, is_active=True).order_by("id")
+        module = qs.filter(id=module_id).first() if module_id else qs.first()
+        if not module:
+            raise CommandError("Faol asosiy modul topilmadi")
+        return module
+
+    def _seed(self, module, options):
+        groups = []
+        for i in range(max(1, options["groups"])):
+            group, _ = Group.objects.get_or_create(name=f"Load test {i + 1}")
+            groups.append(group)
+        module.groups.add(*groups)
+
+        prefix = options["prefix"]
+        existing = set(User.objects.filter(username__startswith=prefix).values_list("username", flat=True))
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{prefix}{i}",
+                    password=password,
+                    full_name=f"Load {i}",
+                    role=UserRole.PARTICIPANT,
+                    group=groups[i % len(groups)],
+                )
+                for i in range(options["participants"])
+                if f"{prefix}{i}" not in existing
+            ],
+            batch_size=500,
+        )
+        delete_results(TestResult.objects.filter(participant__username__startswith=prefix, module=module))
+
+    def _launch(self, port):
+        env = dict(os.environ, SERVER_TIMING="True")
+        server = subprocess.Popen(
+            [sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        base_url = f"http://127.0.0.1:{port}/api"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(f"{base_url}/auth/me/", timeout=1)
+            except urllib.error.HTTPError:
+                return server, base_url
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("Server ishga tushmadi")
+
+    def _call(self, stats, phase, method, url, payload=None, token=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(url, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                body, code, headers = response.read(), response.status, response.headers
+        except urllib.error.HTTPError as exc:
+            body, code, headers = exc.read(), exc.code, exc.headers
+        except OSError as exc:
+            body, code, headers = str(exc).encode(), 599, None
+        stats.record(phase, started, time.perf_counter() - started, code, body, headers)
+        if code >= 400:
+            return None
+        return json.loads(body or b"null")
+
+    def _participant(self, base_url, username, module_id, stats, options):
+        time.sleep(random.uniform(0, options["ramp_seconds"]))
+        login = self._call(stats, "login", "POST", f"{base_url}/auth/login/", {"username": username, "password": PASSWORD})
+        if not login:
+            return
+        token = login["access"]
+        if self._call(stats, "available", "GET", f"{base_url}/tests/available/", token=token) is None:
+            return
+        exam = self._call(stats, "start", "POST", f"{base_url}/tests/start/", {"moduleId": module_id}, token=token)
+        if not exam or not exam["questions"]:
+            return
+        answers = {}
+        for question in exam["questions"]:
+            time.sleep(random.expovariate(1 / options["think_seconds"]) if options["think_seconds"] > 0 else 0)
+            answers[str(question["id"])] = random.randrange(len(question["options"]))
+        self._call(
+            stats,
+            "submit",
+            "POST",
+            f"{base_url}/tests/submit/",
+            {"moduleId": module_id, "answers": answers, "timeTaken": len(answers)},
+            token=token,
+        )
+
+    def _report(self, stats, wall):
+        self.stdout.write(f"Wall time: {wall:.2f}s")
+        self.stdout.write(
+            f"{'phase':<10}{'n':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}{'locked':>8}{'db ms':>10}"
+        )
+        for phase in PHASES:
+            latencies = sorted(stats.latencies[phase])
+            if not latencies:
+                continue
+            first, last = stats.window[phase]
+            throughput = len(latencies) / max(last - first, 1e-9)
+            self.stdout.write(
+                f"{phase:<10}{len(latencies):>6}{throughput:>9.1f}"
+                f"{_percentile(latencies, 50) * 1000:>9.1f}{_percentile(latencies, 95) * 1000:>9.1f}"
+                f"{_percentile(latencies, 99) * 1000:>9.1f}{latencies[-1] * 1000:>9.1f}"
+                f"{stats.errors[phase]:>8}{stats.lock_timeouts[phase]:>8}{stats.db_ms[phase]:>10.1f}"
+            )
@@ -0,0 +1,25 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.db_routing import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the local replica file (stand-in for real replication)"
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES["default"]
+        replica = settings.DATABASES.get(REPLICA_ALIAS)
+        if not replica or "sqlite3" not in primary["ENGINE"] or "sqlite3" not in replica["ENGINE"]:
+            raise CommandError("SQLITE_REPLICA_PATH sozlanmagan")
+
+        source = sqlite3.connect(primary["NAME"])
+        target = sqlite3.connect(replica["NAME"])
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"{primary['NAME']} -> {replica['NAME']}"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Read the database pages an exam touches (modules, question pools, participants, leaderboards, "
+        "search index) into the database/OS page cache before an exam. In-process caches of the running "
+        "web workers are not affected: each worker warms its own at startup with WARM_ON_STARTUP=True."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", type=int, action="append", dest="modules")
+
+    def handle(self, *args, **options):
+        def report(step):
+            self.stdout.write(f"{step['step']:<14} {step['ms']:>9.1f} ms  {step['detail']}")
+
+        state = warm_up(options["modules"], report=report, database_only=True)
+        total = (state["finishedAt"] - state["startedAt"]).total_seconds()
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {total:.2f} s"))
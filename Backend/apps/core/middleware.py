@@ -0,0 +1,30 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+class ServerTimingMiddleware:
+    """Reports wall and database time of each request in a `Server-Timing` header."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_time = [0.0]
+
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_time[0] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(timed))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        response["Server-Timing"] = f"db;dur={db_time[0] * 1000:.2f}, app;dur={total * 1000:.2f}"
+        return response
@@ -1,8 +1,57 @@
+import hashlib
+import unicodedata
+
 from django.conf import settings
 from django.db import models
+from django.dispatch import Signal
+from django.utils import timezone
+
+# Sent by SoftDeleteQuerySet.soft_delete with `ids`: an update() sends no post_save.
+soft_deleted = Signal()
+
+
+def _normalize(value):
+    return " ".join(unicodedata.normalize("NFC", str(value or "")).split()).casefold()
+
+
+def question_content_hash(subject_id, text, options):
+    parts = [str(subject_id), _normalize(text), *(_normalize(o) for o in options)]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self):
+        if not soft_deleted.has_listeners(self.model):
+            return self.update(deleted_at=timezone.now())
+        ids = list(self.values_list("pk", flat=True))
+        count = self.model.all_objects.filter(pk__in=ids).update(deleted_at=timezone.now())
+        if ids:
+            soft_deleted.send(sender=self.model, ids=ids)
+        return count
+
+
+class AliveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
-class Group(models.Model):
+class SoftDeleteModel(models.Model):
+    """Tombstoned rows stay in the table until `purge_tombstones` hard-deletes them."""
+
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = AliveManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
+
+    def soft_delete(self):
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["deleted_at"])
+
+
+class Group(SoftDeleteModel):
     name = models.CharField(max_length=255)
     is_archived = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -11,15 +60,37 @@ class Group(models.Model):
         return self.name
 
 
-class Subject(models.Model):
+def _retire_subjects(ids):
+    """A tombstoned subject takes its questions along and drops out of every module's config."""
+    Question.objects.filter(subject_id__in=ids).soft_delete()
+    ModuleSubjectConfig.objects.filter(subject_id__in=ids).delete()
+
+
+class SubjectQuerySet(SoftDeleteQuerySet):
+    def soft_delete(self):
+        ids = list(self.values_list("pk", flat=True))
+        count = super().soft_delete()
+        if ids:
+            _retire_subjects(ids)
+        return count
+
+
+class Subject(SoftDeleteModel):
     name = models.CharField(max_length=255)
     is_demo = models.BooleanField(default=False)
 
+    objects = AliveManager.from_queryset(SubjectQuerySet)()
+    all_objects = models.Manager.from_queryset(SubjectQuerySet)()
+
     def __str__(self):
         return self.name
 
+    def soft_delete(self):
+        super().soft_delete()
+        _retire_subjects([self.pk])
+
 
-class Module(models.Model):
+class Module(SoftDeleteModel):
     name = models.CharField(max_length=255)
     is_demo = models.BooleanField(default=False)
     groups = models.ManyToManyField(Group, related_name="modules", blank=True)
@@ -38,12 +109,14 @@ class ModuleSubjectConfig(models.Model):
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="subject_configs")
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="module_configs")
     question_count = models.PositiveIntegerField(default=5)
+    # Optional weights per difficulty bucket, e.g. {"easy": 30, "medium": 50, "hard": 20}; see apps.core.sampling.
+    difficulty_mix = models.JSONField(null=True, blank=True)
 
     class Meta:
         unique_together = ("module", "subject")
 
 
-class Question(models.Model):
+class Question(SoftDeleteModel):
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="questions")
     text = models.TextField()
     option_a = models.CharField(max_length=500)
@@ -51,10 +124,27 @@ class Question(models.Model):
     option_c = models.CharField(max_length=500)
     option_d = models.CharField(max_length=500)
     correct_index = models.PositiveSmallIntegerField(default=0)
+    # Natural key for sync/import upserts: subject + normalized text and options (not the answer key).
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+
+    CONTENT_FIELDS = ("subject", "subject_id", "text", "option_a", "option_b", "option_c", "option_d")
 
     def options(self):
         return [self.option_a, self.option_b, self.option_c, self.option_d]
 
+    def refresh_content_hash(self):
+        self.content_hash = question_content_hash(self.subject_id, self.text, self.options())
+        return self.content_hash
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.refresh_content_hash()
+        elif set(update_fields) & set(self.CONTENT_FIELDS):
+            self.refresh_content_hash()
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
 
 class TestResult(models.Model):
     participant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="results")
@@ -69,3 +159,164 @@ class TestResult(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        # Admin changelist: newest first, optionally narrowed to one module or group or a date range.
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="core_result_date_idx"),
+            models.Index(fields=["module", "-date", "-id"], name="core_result_module_date_idx"),
+            models.Index(fields=["group", "-date", "-id"], name="core_result_group_date_idx"),
+        ]
+
+
+class ResultAnswers(models.Model):
+    """Chosen options of one submission, packed by `apps.core.analytics.pack_answers`."""
+
+    result = models.OneToOneField(TestResult, on_delete=models.CASCADE, primary_key=True, related_name="answers")
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="result_answers")
+    data = models.BinaryField()
+
+
+class QuestionStats(models.Model):
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="question_stats")
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="stats")
+    responses = models.PositiveIntegerField(default=0)
+    difficulty = models.FloatField(default=0)
+    discrimination = models.FloatField(null=True, blank=True)
+    option_counts = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("module", "question")
+
+
+class ArchivedResultSummary(models.Model):
+    """One row per (archive file, module, group); ids are plain values so archives outlive the hot rows."""
+
+    file_name = models.CharField(max_length=255, db_index=True)
+    module_id = models.BigIntegerField(db_index=True)
+    module_name = models.CharField(max_length=255)
+    group_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    group_name = models.CharField(max_length=255, blank=True)
+    result_count = models.PositiveIntegerField(default=0)
+    passed_count = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveBigIntegerField(default=0)
+    first_date = models.DateTimeField()
+    last_date = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-archived_at", "module_id"]
+
+
+class LeaderboardEntry(models.Model):
+    """Best result of a participant in a module; the durable side of `apps.core.leaderboard`."""
+
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    group = models.ForeignKey(Group, null=True, blank=True, on_delete=models.SET_NULL, related_name="leaderboard_entries")
+    participant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    # Deleting the result must not take the participant off the board: `rebuild_entries` moves the entry to the next best.
+    result = models.OneToOneField(TestResult, null=True, blank=True, on_delete=models.SET_NULL, related_name="leaderboard_entry")
+    score = models.PositiveIntegerField(default=0)
+    time_taken = models.PositiveIntegerField(null=True, blank=True)
+    date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("module", "participant")
+        indexes = [models.Index(fields=["module", "group", "-score"])]
+
+
+class DataVersion(models.Model):
+    """Per-entity-type change counter shared by all worker processes; see `apps.core.coherence`."""
+
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}={self.version}"
+
+
+class AnswerDraft(models.Model):
+    """
+    The paper issued by start plus its autosaved, not yet submitted answers;
+    `data` uses the ResultAnswers encoding.
+    """
+
+    participant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="answer_drafts")
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="answer_drafts")
+    # Question ids in the order they were shown; a restart gets the same paper back.
+    questions = models.JSONField(default=list)
+    issued_at = models.DateTimeField(default=timezone.now)
+    data = models.BinaryField(default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("participant", "module")
+
+
+class IdempotencyKey(models.Model):
+    """First response to a request carrying an Idempotency-Key header, replayed for retries."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=100)
+    endpoint = models.CharField(max_length=50)
+    # sha256 of the request body; the same key with a different body is rejected, not replayed.
+    request_hash = models.CharField(max_length=64, default="")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class QuestionDifficulty(models.Model):
+    """Running answer counts per question across all modules; drives difficulty-stratified sampling."""
+
+    question = models.OneToOneField(Question, primary_key=True, on_delete=models.CASCADE, related_name="difficulty")
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+
+class ParticipantSummary(models.Model):
+    """
+    Dashboard figures per module for one participant, updated by submit and
+    rebuilt from TestResult when missing; see `apps.core.summaries`.
+    """
+
+    participant = models.OneToOneField(settings.AUTH_USER_MODEL, primary_key=True, on_delete=models.CASCADE, related_name="summary")
+    # {"<module id>": {"attempts", "passedAttempts", "bestScore", "lastScore", "lastResultId", "lastDate"}}
+    modules = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class MainAttempt(models.Model):
+    """
+    A main (non-demo) module taken by a participant. Outlives the result
+    row, so an archived result still counts as taken; see `apps.core.services.main_taken`.
+    """
+
+    participant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="main_attempts")
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="main_attempts")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("participant", "module")
+
+
+class DemoAttempt(models.Model):
+    """
+    Demo attempts per (participant, module): `attempts` counts every submit
+    and backs DEMO_MAX_ATTEMPTS; the `compacted_*` fields aggregate attempts
+    whose raw TestResult rows were dropped by `compact_demo_results`.
+    """
+
+    participant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="demo_attempts")
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="demo_attempts")
+    attempts = models.PositiveIntegerField(default=0)
+    compacted_count = models.PositiveIntegerField(default=0)
+    compacted_passed = models.PositiveIntegerField(default=0)
+    compacted_best_score = models.PositiveIntegerField(default=0)
+    compacted_last_score = models.PositiveIntegerField(default=0)
+    compacted_last_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("participant", "module")
@@ -0,0 +1,99 @@
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimated_rows(table):
+    """
+    Cheap row estimate: on SQLite the rowid span (two index seeks; exact until
+    rows are deleted, then too high), on PostgreSQL pg_class.reltuples. None when unknown.
+    """
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"SELECT MAX(rowid) - MIN(rowid) + 1 FROM {qn(table)}")
+            row = cursor.fetchone()
+            return row[0] if row and row[0] is not None else None
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Exact COUNT(*) up to EXACT_COUNT_LIMIT rows. Past that, an unfiltered
+    list shows `estimated_rows`. A filtered one stops counting at the limit
+    and treats that as a lower bound (`capped`): asking for a page at or past
+    it counts on to one row beyond that page, so the list keeps a next page
+    while rows remain. An estimate can overshoot (deleted rows leave rowid
+    gaps), so the first short or empty page found while paging fixes the
+    count to the real end.
+    """
+
+    estimated = False
+    capped = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        exact = queryset.order_by()[: EXACT_COUNT_LIMIT + 1].count()
+        if exact <= EXACT_COUNT_LIMIT:
+            return exact
+        self.estimated = True
+        if queryset.query.where == queryset.model._default_manager.all().query.where:
+            estimate = estimated_rows(queryset.model._meta.db_table)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        self.capped = True
+        return exact
+
+    def page(self, number):
+        if self.count and self.capped:
+            number = self._count_through(number)
+        page = super().page(number)
+        if not self.estimated or len(page.object_list) == self.per_page:
+            return page
+        offset = (page.number - 1) * self.per_page
+        if page.object_list:
+            self._set_count(offset + len(page.object_list))
+            return page
+        # Past the real end: count the rows before this page and serve the last one.
+        self._set_count(self.object_list.order_by()[:offset].count())
+        return super().page(self.num_pages)
+
+    def _count_through(self, number):
+        """Count on past a capped count to one row beyond page `number`; past the real end, serve the last page."""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return number
+        limit = number * self.per_page + 1
+        if limit <= self.count:
+            return number
+        counted = self.object_list.order_by()[:limit].count()
+        if counted == limit:
+            self.__dict__["count"] = counted
+            self.__dict__.pop("num_pages", None)
+            return number
+        self._set_count(counted)
+        return min(number, self.num_pages)
+
+    def _set_count(self, count):
+        self.__dict__["count"] = count
+        self.__dict__.pop("num_pages", None)
+        self.estimated = False
+        self.capped = False
+
+
+class EstimatedCountChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        # Fetching the page may have corrected an estimate or counted past a capped one.
+        self.result_count_capped = self.paginator.capped
+        if self.result_count != self.paginator.count:
+            self.result_count = self.paginator.count
+            self.multi_page = self.result_count > self.list_per_page
+            self.page_num = min(self.page_num, self.paginator.num_pages)
@@ -0,0 +1,137 @@
+import cProfile
+import io
+import json
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+CAPTURE_NAME_RE = re.compile(r"^[\w.-]+\.prof$")
+# Arm state is a file so every worker process sees it; re-read at most this often.
+ARM_REFRESH_SECONDS = 2.0
+
+_profiler_lock = threading.Lock()
+
+
+def profile_dir():
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _arm_file():
+    return profile_dir() / "armed.json"
+
+
+def arm(view_name, sample_rate, minutes):
+    state = {
+        "view": view_name,
+        "sampleRate": max(0.0, min(1.0, float(sample_rate))),
+        "expiresAt": time.time() + minutes * 60,
+    }
+    _arm_file().write_text(json.dumps(state))
+    return state
+
+
+def disarm():
+    _arm_file().unlink(missing_ok=True)
+
+
+def armed_state():
+    try:
+        state = json.loads(_arm_file().read_text())
+    except (OSError, ValueError):
+        return None
+    if state.get("expiresAt", 0) < time.time():
+        return None
+    return state
+
+
+def list_captures():
+    files = sorted(profile_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {
+            "name": p.name,
+            "size": p.stat().st_size,
+            "createdAt": datetime.fromtimestamp(p.stat().st_mtime, tz=timezone.get_current_timezone()),
+        }
+        for p in files
+    ]
+
+
+def capture_path(name):
+    if not CAPTURE_NAME_RE.match(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+def summarize(path, limit=30):
+    out = io.StringIO()
+    stats = pstats.Stats(str(path), stream=out)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def _save(profiler, view_name, elapsed):
+    directory = profile_dir()
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S-%f")
+    profiler.dump_stats(str(directory / f"{stamp}_{view_name}_{int(elapsed * 1000)}ms.prof"))
+    captures = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for old in captures[: max(0, len(captures) - settings.PROFILE_MAX_FILES)]:
+        old.unlink(missing_ok=True)
+
+
+def view_name(view_func):
+    # DRF views: function name for @api_view, class name for ViewSets.
+    cls = getattr(view_func, "cls", None)
+    return cls.__name__ if cls is not None else getattr(view_func, "__name__", "")
+
+
+class ProfilingMiddleware:
+    """
+    Profiles matching views while armed. When disarmed the per-request cost is
+    a single clock comparison until the next arm-file refresh.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._state = None
+        self._checked_at = 0.0
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        now = time.monotonic()
+        if now - self._checked_at > ARM_REFRESH_SECONDS:
+            self._state = armed_state()
+            self._checked_at = now
+        state = self._state
+        if state is None or view_name(view_func) != state["view"]:
+            return None
+        if random.random() >= state["sampleRate"]:
+            return None
+        # cProfile allows one active profiler per process on recent Pythons.
+        if not _profiler_lock.acquire(blocking=False):
+            return None
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                response = view_func(request, *view_args, **view_kwargs)
+                if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                    response.render()
+            finally:
+                profiler.disable()
+            _save(profiler, state["view"], time.perf_counter() - started)
+        finally:
+            _profiler_lock.release()
+        return response
@@ -0,0 +1,221 @@
+import heapq
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from . import coherence
+from .coherence import QUESTIONS, versions
+from .models import Question, QuestionDifficulty
+from .writebehind import WriteBehindBuffer
+
+BUCKETS = ("easy", "medium", "hard")
+# Smoothed correct rate (correct + 1) / (attempts + 2): unseen questions start at 0.5, i.e. medium.
+EASY_RATE = 0.7
+HARD_RATE = 0.4
+
+
+def bucket_for(attempts, correct):
+    rate = (correct + 1) / (attempts + 2)
+    if rate >= EASY_RATE:
+        return "easy"
+    if rate < HARD_RATE:
+        return "hard"
+    return "medium"
+
+
+def clean_mix(value):
+    """Validate a difficulty mix; returns {bucket: weight} or None. Raises ValueError."""
+    if value in (None, {}):
+        return None
+    if not isinstance(value, dict) or not set(value) <= set(BUCKETS):
+        raise ValueError(f"difficultyMix kalitlari: {', '.join(BUCKETS)}")
+    mix = {}
+    for bucket, weight in value.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError("difficultyMix qiymatlari manfiy bo'lmagan son bo'lishi kerak")
+        if weight:
+            mix[bucket] = weight
+    return mix or None
+
+
+def allocate(count, mix):
+    """Split `count` over the mix weights by largest remainder."""
+    total = sum(mix.values())
+    exact = {bucket: count * weight / total for bucket, weight in mix.items()}
+    counts = {bucket: int(share) for bucket, share in exact.items()}
+    rest = count - sum(counts.values())
+    for bucket in sorted(exact, key=lambda b: exact[b] - counts[b], reverse=True)[:rest]:
+        counts[bucket] += 1
+    return counts
+
+
+class SubjectPool:
+    """Live question ids of one subject, bucketed by difficulty; swap-remove keeps moves O(1)."""
+
+    def __init__(self, rows):
+        self.buckets = {bucket: [] for bucket in BUCKETS}
+        self.position = {}
+        self.stats = {}
+        for question_id, attempts, correct in rows:
+            self.stats[question_id] = [attempts or 0, correct or 0]
+            self._insert(question_id, bucket_for(attempts or 0, correct or 0))
+        self.loaded_at = time.monotonic()
+
+    def _insert(self, question_id, bucket):
+        ids = self.buckets[bucket]
+        self.position[question_id] = (bucket, len(ids))
+        ids.append(question_id)
+
+    def _remove(self, question_id):
+        bucket, index = self.position.pop(question_id)
+        ids = self.buckets[bucket]
+        last = ids.pop()
+        if last != question_id:
+            ids[index] = last
+            self.position[last] = (bucket, index)
+
+    def record(self, question_id, attempts, correct):
+        stats = self.stats.get(question_id)
+        if stats is None:
+            return
+        old = bucket_for(*stats)
+        stats[0] += attempts
+        stats[1] += correct
+        new = bucket_for(*stats)
+        if new != old:
+            self._remove(question_id)
+            self._insert(question_id, new)
+
+    def _take(self, ids, count, randomize):
+        if count >= len(ids):
+            return list(ids)
+        if randomize:
+            return random.sample(ids, count)
+        return heapq.nsmallest(count, ids)
+
+    def _uniform(self, count):
+        # Uniform over the whole subject without concatenating the buckets.
+        sizes = [(bucket, len(self.buckets[bucket])) for bucket in BUCKETS]
+        selected = []
+        for pick in random.sample(range(len(self.position)), min(count, len(self.position))):
+            for bucket, size in sizes:
+                if pick < size:
+                    selected.append(self.buckets[bucket][pick])
+                    break
+                pick -= size
+        return selected
+
+    def sample(self, count, mix=None, randomize=True):
+        if not mix:
+            return self._uniform(count) if randomize else heapq.nsmallest(count, self.position)
+
+        wanted = allocate(count, mix)
+        selected = []
+        shortfall = 0
+        for bucket in BUCKETS:
+            taken = self._take(self.buckets[bucket], wanted.get(bucket, 0), randomize)
+            shortfall += wanted.get(bucket, 0) - len(taken)
+            selected.extend(taken)
+        # A thin bucket is topped up from its neighbours, nearest difficulty first.
+        if shortfall:
+            chosen = set(selected)
+            for bucket in sorted(BUCKETS, key=lambda b: (b != "medium", -mix.get(b, 0))):
+                spare = [qid for qid in self.buckets[bucket] if qid not in chosen]
+                extra = self._take(spare, shortfall, randomize)
+                selected.extend(extra)
+                shortfall -= len(extra)
+                if not shortfall:
+                    break
+        return selected
+
+
+class DifficultyCounter(WriteBehindBuffer):
+    """(attempts, correct) deltas per question, added onto QuestionDifficulty in bulk."""
+
+    name = "difficulty-flush"
+
+    def merge(self, old, new):
+        return (old[0] + new[0], old[1] + new[1])
+
+    def interval(self):
+        return settings.SAMPLING_FLUSH_SECONDS
+
+    @transaction.atomic
+    def write(self, pending):
+        existing = set(Question.all_objects.filter(id__in=pending).values_list("id", flat=True))
+        stored = dict(
+            (qid, (attempts, correct))
+            for qid, attempts, correct in QuestionDifficulty.objects.select_for_update()
+            .filter(question_id__in=existing)
+            .values_list("question_id", "attempts", "correct")
+        )
+        rows = []
+        for question_id in existing:
+            attempts, correct = stored.get(question_id, (0, 0))
+            delta_attempts, delta_correct = pending[question_id]
+            rows.append(
+                QuestionDifficulty(question_id=question_id, attempts=attempts + delta_attempts, correct=correct + delta_correct)
+            )
+        QuestionDifficulty.objects.bulk_create(
+            rows, batch_size=500, update_conflicts=True, unique_fields=["question"], update_fields=["attempts", "correct"]
+        )
+
+
+class SamplingIndex:
+    """
+    Per-process SubjectPools, built lazily from the question table. Question
+    edits bump the shared `questions` counter and drop every pool; answer
+    counts from other workers arrive when a pool is older than
+    SAMPLING_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._version = None
+        self.counter = DifficultyCounter()
+
+    def pool(self, subject_id):
+        version = versions.get(QUESTIONS)
+        with self._lock:
+            if version != self._version:
+                self._pools.clear()
+                self._version = version
+            pool = self._pools.get(subject_id)
+            if pool is None or time.monotonic() - pool.loaded_at > settings.SAMPLING_REFRESH_SECONDS:
+                rows = Question.objects.filter(subject_id=subject_id).values_list(
+                    "id", "difficulty__attempts", "difficulty__correct"
+                )
+                pool = self._pools[subject_id] = SubjectPool(rows)
+            return pool
+
+    def live(self, subject_ids, question_ids):
+        """The subset of `question_ids` that are live questions of `subject_ids`."""
+        pools = [self.pool(subject_id) for subject_id in subject_ids]
+        with self._lock:
+            return {qid for qid in question_ids if any(qid in pool.position for pool in pools)}
+
+    def sample(self, subject_id, count, mix=None, randomize=True):
+        pool = self.pool(subject_id)
+        with self._lock:
+            return pool.sample(count, mix, randomize)
+
+    def record(self, outcomes):
+        """`outcomes`: (subject_id, question_id, is_correct) for every graded answer."""
+        with self._lock:
+            for subject_id, question_id, is_correct in outcomes:
+                pool = self._pools.get(subject_id)
+                if pool is not None:
+                    pool.record(question_id, 1, int(is_correct))
+        for _, question_id, is_correct in outcomes:
+            self.counter.add(question_id, (1, int(is_correct)))
+
+
+sampling_index = SamplingIndex()
+
+
+def invalidate_question_pools(**kwargs):
+    coherence.bump(QUESTIONS)
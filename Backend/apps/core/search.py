@@ -0,0 +1,200 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Question
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class QuestionSearchBackend:
+    """Interface for question bank search; `search` returns (ids ordered by relevance, total)."""
+
+    def index(self, questions):
+        raise NotImplementedError
+
+    def remove(self, ids):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def search(self, query, subject_id=None, is_demo=None, offset=0, limit=20):
+        raise NotImplementedError
+
+    def filter(self, queryset, query):
+        """Narrow a Question queryset to matches of `query` (admin changelist search)."""
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(QuestionSearchBackend):
+    """Portable fallback: substring match through the ORM, no extra index to maintain."""
+
+    def index(self, questions):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def filter(self, queryset, query):
+        for token in TOKEN_RE.findall(query):
+            queryset = queryset.filter(
+                Q(text__icontains=token)
+                | Q(option_a__icontains=token)
+                | Q(option_b__icontains=token)
+                | Q(option_c__icontains=token)
+                | Q(option_d__icontains=token)
+            )
+        return queryset
+
+    def search(self, query, subject_id=None, is_demo=None, offset=0, limit=20):
+        qs = self.filter(Question.objects.all(), query)
+        if subject_id:
+            qs = qs.filter(subject_id=subject_id)
+        if is_demo is not None:
+            qs = qs.filter(subject__is_demo=is_demo)
+        qs = qs.order_by("-id")
+        return list(qs.values_list("id", flat=True)[offset : offset + limit]), qs.count()
+
+
+def fts_match(query, prefix_all=False):
+    """FTS5 MATCH expression: whole words, except the last one (or all, with prefix_all) which is still being typed."""
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    if prefix_all:
+        return " ".join(f'"{token}"*' for token in tokens)
+    return " ".join([f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+
+
+class SQLiteFTSIndex:
+    """An FTS5 table keyed by the source row id, created and filled on first use."""
+
+    def __init__(self, table, columns, source_sql):
+        self.table = table
+        self.columns = columns
+        # SELECT id, <columns...> FROM ... for a full rebuild.
+        self.source_sql = source_sql
+        self._ready = False
+        # Created inside a transaction that has not committed yet; a rollback drops the table again.
+        self._pending = False
+
+    def ensure(self):
+        if self._ready:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [self.table])
+            if cursor.fetchone() is not None:
+                self._ready = not self._pending
+                return
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {self.table} USING fts5({', '.join(self.columns)}, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) {self.source_sql}")
+        if connection.in_atomic_block:
+            self._pending = True
+            transaction.on_commit(self._committed)
+        else:
+            self._ready = True
+
+    def _committed(self):
+        self._pending = False
+        self._ready = True
+
+    def upsert(self, rows):
+        """`rows`: (id, *column values)."""
+        self.ensure()
+        if not rows:
+            return
+        placeholders = ", ".join(["%s"] * (len(self.columns) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) VALUES ({placeholders})", rows
+            )
+
+    def remove(self, ids):
+        self.ensure()
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(i,) for i in ids])
+
+    def rebuild(self):
+        self.ensure()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) {self.source_sql}")
+
+
+class SQLiteFTSBackend(QuestionSearchBackend):
+    """SQLite FTS5 index keyed by question id, ranked with bm25."""
+
+    table = "core_question_fts"
+
+    def __init__(self):
+        self.fts = SQLiteFTSIndex(
+            self.table,
+            ("text", "options"),
+            "SELECT id, text, option_a || ' ' || option_b || ' ' || option_c || ' ' || option_d "
+            "FROM core_question WHERE deleted_at IS NULL",
+        )
+
+    def index(self, questions):
+        self.fts.upsert([(q.id, q.text, " ".join(q.options())) for q in questions])
+
+    def remove(self, ids):
+        self.fts.remove(ids)
+
+    def rebuild(self):
+        self.fts.rebuild()
+
+    def search(self, query, subject_id=None, is_demo=None, offset=0, limit=20):
+        match = fts_match(query)
+        if not match:
+            return [], 0
+        self.fts.ensure()
+        where = [f"{self.table} MATCH %s", "q.deleted_at IS NULL"]
+        params = [match]
+        if subject_id:
+            where.append("q.subject_id = %s")
+            params.append(subject_id)
+        if is_demo is not None:
+            where.append("s.is_demo = %s")
+            params.append(is_demo)
+        base = (
+            f"FROM {self.table} f "
+            "JOIN core_question q ON q.id = f.rowid "
+            "JOIN core_subject s ON s.id = q.subject_id "
+            f"WHERE {' AND '.join(where)}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT q.id {base} ORDER BY f.rank LIMIT %s OFFSET %s", params + [limit, offset])
+            ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"SELECT COUNT(*) {base}", params)
+            total = cursor.fetchone()[0]
+        return ids, total
+
+    def filter(self, queryset, query):
+        match = fts_match(query)
+        if not match:
+            return queryset
+        self.fts.ensure()
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]))
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    path = getattr(settings, "QUESTION_SEARCH_BACKEND", "")
+    if path:
+        return import_string(path)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
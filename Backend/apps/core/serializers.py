@@ -2,7 +2,9 @@ from django.db import transaction
 from rest_framework import serializers
 
 from apps.accounts.serializers import UserSerializer
-from .models import Group, Module, ModuleSubjectConfig, Question, Subject, TestResult
+from .blueprints import module_settings
+from .models import Group, Module, ModuleSubjectConfig, Question, QuestionStats, Subject, TestResult
+from .sampling import clean_mix
 
 
 def _to_bool(value, default=False):
@@ -36,10 +38,17 @@ class SubjectSerializer(serializers.ModelSerializer):
 class ModuleSubjectConfigSerializer(serializers.ModelSerializer):
     subjectId = serializers.IntegerField(source="subject_id")
     questionCount = serializers.IntegerField(source="question_count")
+    difficultyMix = serializers.JSONField(source="difficulty_mix", required=False, allow_null=True)
 
     class Meta:
         model = ModuleSubjectConfig
-        fields = ["id", "subjectId", "questionCount"]
+        fields = ["id", "subjectId", "questionCount", "difficultyMix"]
+
+    def validate_difficultyMix(self, value):
+        try:
+            return clean_mix(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
 
 
 class ModuleSerializer(serializers.ModelSerializer):
@@ -53,13 +62,7 @@ class ModuleSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "isDemo", "groupIds", "subjectConfigs", "settings"]
 
     def get_settings(self, obj):
-        return {
-            "pointsPerAnswer": obj.points_per_answer,
-            "durationMinutes": obj.duration_minutes,
-            "passingScore": obj.passing_score,
-            "randomize": obj.randomize,
-            "isActive": obj.is_active,
-        }
+        return module_settings(obj)
 
     @transaction.atomic
     def create(self, validated_data):
@@ -167,6 +170,16 @@ class TestResultSerializer(serializers.ModelSerializer):
         ]
 
 
+class QuestionStatsSerializer(serializers.ModelSerializer):
+    questionId = serializers.IntegerField(source="question_id", read_only=True)
+    optionCounts = serializers.JSONField(source="option_counts", read_only=True)
+    computedAt = serializers.DateTimeField(source="computed_at", read_only=True)
+
+    class Meta:
+        model = QuestionStats
+        fields = ["questionId", "responses", "difficulty", "discrimination", "optionCounts", "computedAt"]
+
+
 class SnapshotSerializer(serializers.Serializer):
     users = UserSerializer(many=True)
     groups = GroupSerializer(many=True)
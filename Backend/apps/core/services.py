@@ -1,21 +1,30 @@
 import random
 
-from .models import Module, Question
+from django.db import IntegrityError, transaction
 
+from .blueprints import ModuleBlueprint
+from .demo_attempts import recount_attempts
+from .leaderboard import rebuild_entries
+from .models import MainAttempt, Question, TestResult, question_content_hash
+from .sampling import invalidate_question_pools, sampling_index
+from .summaries import invalidate_summaries
 
-def pick_questions_for_module(module: Module):
-    selected = []
-    for cfg in module.subject_configs.select_related("subject").all():
-        pool = list(Question.objects.filter(subject=cfg.subject).order_by("id"))
-        if module.randomize:
-            random.shuffle(pool)
-        selected.extend(pool[: cfg.question_count])
+
+def pick_questions_for_module(module: ModuleBlueprint):
+    ids = []
+    for subject_id, question_count, mix in module.subject_configs:
+        ids.extend(sampling_index.sample(subject_id, question_count, dict(mix) if mix else None, module.randomize))
 
     if module.randomize:
-        random.shuffle(selected)
+        random.shuffle(ids)
+    return paper_payload(ids)
+
 
+def paper_payload(question_ids):
+    """Live questions of `question_ids` in that order, as sent to the participant."""
+    by_id = Question.objects.in_bulk(question_ids)
     payload = []
-    for q in selected:
+    for q in (by_id[qid] for qid in question_ids if qid in by_id):
         payload.append(
             {
                 "id": q.id,
@@ -25,3 +34,138 @@ def pick_questions_for_module(module: Module):
             }
         )
     return payload
+
+
+QUESTION_UPSERT_FIELDS = [
+    "subject_id",
+    "text",
+    "option_a",
+    "option_b",
+    "option_c",
+    "option_d",
+    "correct_index",
+    "content_hash",
+    "deleted_at",
+]
+
+
+def upsert_questions(rows):
+    """
+    Match `rows` ({id?, subject_id, text, options, correct_index}) to stored
+    questions by id when the content is unchanged, else by content hash, else
+    by id as an edit; create the rest. Only rows that actually differ are
+    written. Returns (questions in row order, created, updated).
+    """
+    for row in rows:
+        row["content_hash"] = question_content_hash(row["subject_id"], row["text"], row["options"])
+
+    stored = {}
+    columns = ("id", "content_hash", "correct_index", "deleted_at")
+    for qid, content_hash, correct_index, deleted_at in Question.all_objects.filter(
+        subject_id__in={row["subject_id"] for row in rows}
+    ).values_list(*columns):
+        stored[qid] = (content_hash, correct_index, deleted_at)
+    missing = [row["id"] for row in rows if row.get("id") and row["id"] not in stored]
+    for start in range(0, len(missing), 500):
+        for qid, content_hash, correct_index, deleted_at in Question.all_objects.filter(
+            id__in=missing[start : start + 500]
+        ).values_list(*columns):
+            stored[qid] = (content_hash, correct_index, deleted_at)
+
+    by_hash = {}
+    # Live rows first, then oldest, so duplicates resolve to the same survivor every time.
+    for qid, (content_hash, _, deleted_at) in sorted(stored.items(), key=lambda item: (item[1][2] is not None, item[0])):
+        by_hash.setdefault(content_hash, []).append(qid)
+
+    used = set()
+    questions, created, updated = [], [], []
+    for row in rows:
+        qid, content_hash = row.get("id"), row["content_hash"]
+        if qid in stored and qid not in used and stored[qid][0] == content_hash:
+            match = qid
+        else:
+            match = next((c for c in by_hash.get(content_hash, ()) if c not in used), None)
+            if match is None and qid in stored and qid not in used:
+                match = qid
+
+        question = Question(
+            id=match,
+            subject_id=row["subject_id"],
+            text=row["text"],
+            option_a=row["options"][0],
+            option_b=row["options"][1],
+            option_c=row["options"][2],
+            option_d=row["options"][3],
+            correct_index=row["correct_index"],
+            content_hash=content_hash,
+        )
+        if match is None:
+            created.append(question)
+        else:
+            used.add(match)
+            if stored[match] != (content_hash, row["correct_index"], None):
+                updated.append(question)
+        questions.append(question)
+
+    Question.objects.bulk_create(created, batch_size=500)
+    Question.all_objects.bulk_update(updated, QUESTION_UPSERT_FIELDS, batch_size=500)
+    if created or updated:
+        invalidate_question_pools()
+    return questions, created, updated
+
+
+def main_taken(participant_id, module_id):
+    """True once the participant has a result for this main module, stored or archived."""
+    return (
+        MainAttempt.objects.filter(participant_id=participant_id, module_id=module_id).exists()
+        or TestResult.objects.filter(participant_id=participant_id, module_id=module_id).exists()
+    )
+
+
+def reserve_main_attempt(participant_id, module_id):
+    """
+    Mark the main module taken; False when it already is. Call inside the
+    submit's transaction: the unique index lets only one concurrent submit through.
+    """
+    try:
+        with transaction.atomic():
+            MainAttempt.objects.create(participant_id=participant_id, module_id=module_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_main_attempts(pairs):
+    """Forget the markers of results deleted outright (not archived), so those exams can be taken again."""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+    markers = MainAttempt.objects.filter(participant_id__in={p for p, _ in pairs}, module_id__in={m for _, m in pairs})
+    ids = [pk for pk, p, m in markers.values_list("id", "participant_id", "module_id") if (p, m) in pairs]
+    return MainAttempt.objects.filter(id__in=ids).delete()[0]
+
+
+def taken_main_modules(participant_id):
+    return set(MainAttempt.objects.filter(participant_id=participant_id).values_list("module_id", flat=True)) | set(
+        TestResult.objects.filter(participant_id=participant_id, module__is_demo=False).values_list("module_id", flat=True)
+    )
+
+
+def delete_results(queryset, batch_size=1000):
+    """
+    Hard-delete results in id batches and resync what is derived from them:
+    leaderboards, participant summaries and demo attempt counters. Returns rows deleted.
+    """
+    total = 0
+    while True:
+        batch = list(queryset.order_by("id").values_list("id", "participant_id", "module_id")[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            TestResult.objects.filter(id__in=[row[0] for row in batch]).delete()
+            rebuild_entries(pairs={(row[2], row[1]) for row in batch})
+            invalidate_summaries({row[1] for row in batch})
+            recount_attempts({row[2] for row in batch}, {row[1] for row in batch})
+            release_main_attempts((row[1], row[2]) for row in batch)
+        total += len(batch)
+    return total
@@ -0,0 +1,37 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .blueprints import invalidate_blueprints
+from .models import Group, Module, ModuleSubjectConfig, Question, Subject, soft_deleted
+from .sampling import invalidate_question_pools
+from .search import get_search_backend
+
+for model in (Group, Module, ModuleSubjectConfig):
+    post_save.connect(invalidate_blueprints, sender=model, dispatch_uid=f"blueprints_save_{model.__name__}")
+    post_delete.connect(invalidate_blueprints, sender=model, dispatch_uid=f"blueprints_delete_{model.__name__}")
+m2m_changed.connect(invalidate_blueprints, sender=Module.groups.through, dispatch_uid="blueprints_module_groups")
+for model in (Group, Module):
+    soft_deleted.connect(invalidate_blueprints, sender=model, dispatch_uid=f"blueprints_soft_delete_{model.__name__}")
+
+for model in (Question, Subject):
+    post_save.connect(invalidate_question_pools, sender=model, dispatch_uid=f"question_pools_save_{model.__name__}")
+    post_delete.connect(invalidate_question_pools, sender=model, dispatch_uid=f"question_pools_delete_{model.__name__}")
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    if instance.deleted_at:
+        get_search_backend().remove([instance.id])
+    else:
+        get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, **kwargs):
+    get_search_backend().remove([instance.id])
+
+
+@receiver(soft_deleted, sender=Question)
+def unindex_soft_deleted_questions(sender, ids, **kwargs):
+    get_search_backend().remove(ids)
+    invalidate_question_pools()
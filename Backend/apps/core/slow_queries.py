@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .profiling import view_name
+
+LOG_NAME = "slow_queries.jsonl"
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_local = threading.local()
+_explained = {}
+_explained_lock = threading.Lock()
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def normalize(sql):
+    """SQL with literals and parameters as `?` and IN lists folded, so one query shape has one text."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def log_dir():
+    path = Path(settings.SLOW_QUERY_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _log():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            handler = RotatingFileHandler(
+                log_dir() / LOG_NAME, maxBytes=settings.SLOW_QUERY_MAX_BYTES, backupCount=settings.SLOW_QUERY_BACKUPS
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("apps.core.slow_queries.log")
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            _logger = logger
+        return _logger
+
+
+def _due_for_explain(key):
+    """At most one plan per fingerprint per SLOW_QUERY_EXPLAIN_SECONDS in each process."""
+    now = time.monotonic()
+    with _explained_lock:
+        if now - _explained.get(key, -settings.SLOW_QUERY_EXPLAIN_SECONDS) < settings.SLOW_QUERY_EXPLAIN_SECONDS:
+            return False
+        _explained[key] = now
+        return True
+
+
+def _explain(connection, sql, params):
+    if sql.split(None, 1)[0].upper() not in {"SELECT", "WITH"}:
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    _local.explaining = True
+    try:
+        # A failed EXPLAIN must not poison the caller's transaction.
+        with transaction.atomic(using=connection.alias) if connection.in_atomic_block else ExitStack():
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                rows = cursor.fetchall()
+    except Exception as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        _local.explaining = False
+    if connection.vendor == "sqlite":
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def record(connection, sql, params, seconds, view):
+    normalized = normalize(sql)
+    key = fingerprint(normalized)
+    entry = {
+        "at": timezone.now().isoformat(),
+        "fingerprint": key,
+        "sql": normalized,
+        "view": view,
+        "ms": round(seconds * 1000, 2),
+        "alias": connection.alias,
+    }
+    if _due_for_explain(key):
+        entry["plan"] = _explain(connection, sql, params)
+    _log().info(json.dumps(entry))
+
+
+class SlowQueryMiddleware:
+    """
+    Logs every query slower than SLOW_QUERY_MS, with the view that ran it.
+    Fast queries cost two clock reads; EXPLAIN runs only for a slow query
+    whose fingerprint has no recent plan.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_MS / 1000
+
+    def __call__(self, request):
+        request.slow_query_view = request.path
+        threshold = self.threshold
+
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            result = execute(sql, params, many, context)
+            elapsed = time.perf_counter() - started
+            if elapsed >= threshold and not many and not getattr(_local, "explaining", False):
+                record(context["connection"], sql, params, elapsed, request.slow_query_view)
+            return result
+
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(timed))
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.slow_query_view = view_name(view_func) or request.path
+
+
+def _entries():
+    paths = [log_dir() / LOG_NAME] + [log_dir() / f"{LOG_NAME}.{i}" for i in range(1, settings.SLOW_QUERY_BACKUPS + 1)]
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+
+
+TOP_ORDERS = {"total": "totalMs", "max": "maxMs", "count": "count", "avg": "avgMs"}
+
+
+def top_queries(limit=20, order="total"):
+    """Logged queries grouped by fingerprint, worst first by `order` (total, max, count or avg)."""
+    groups = {}
+    for entry in _entries():
+        group = groups.get(entry["fingerprint"])
+        if group is None:
+            group = groups[entry["fingerprint"]] = {
+                "fingerprint": entry["fingerprint"],
+                "sql": entry["sql"],
+                "count": 0,
+                "totalMs": 0.0,
+                "maxMs": 0.0,
+                "views": {},
+                "lastSeen": entry["at"],
+                "plan": None,
+            }
+        group["count"] += 1
+        group["totalMs"] += entry["ms"]
+        group["maxMs"] = max(group["maxMs"], entry["ms"])
+        group["views"][entry["view"]] = group["views"].get(entry["view"], 0) + 1
+        if entry["at"] >= group["lastSeen"]:
+            group["lastSeen"] = entry["at"]
+        if entry.get("plan") and (group["plan"] is None or entry["at"] >= group["planAt"]):
+            group["plan"], group["planAt"] = entry["plan"], entry["at"]
+
+    rows = []
+    for group in groups.values():
+        group.pop("planAt", None)
+        group["totalMs"] = round(group["totalMs"], 2)
+        group["avgMs"] = round(group["totalMs"] / group["count"], 2)
+        views = sorted(group["views"].items(), key=lambda kv: -kv[1])
+        group["views"] = [{"view": view, "count": count} for view, count in views]
+        rows.append(group)
+    rows.sort(key=lambda g: g[TOP_ORDERS.get(order, "totalMs")], reverse=True)
+    return rows[:limit]
+
+
+def report(limit=20, order="total"):
+    return {"enabled": settings.SLOW_QUERY_LOG, "thresholdMs": settings.SLOW_QUERY_MS, "queries": top_queries(limit, order)}
@@ -0,0 +1,122 @@
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from apps.accounts.models import User
+from .blueprints import blueprints
+from .models import DemoAttempt, ParticipantSummary, TestResult
+
+DEMO_MAX_ATTEMPTS = 5
+
+_datetime = serializers.DateTimeField().to_representation
+
+
+def _add(entries, result_id, module_id, score, is_passed, date):
+    entry = entries.setdefault(
+        str(module_id), {"attempts": 0, "passedAttempts": 0, "bestScore": 0, "lastScore": 0, "lastResultId": None, "lastDate": None}
+    )
+    entry["attempts"] += 1
+    entry["passedAttempts"] += int(is_passed)
+    entry["bestScore"] = max(entry["bestScore"], score)
+    # Results are added in id order, so the latest one is always the last one added.
+    entry["lastScore"] = score
+    entry["lastResultId"] = result_id
+    entry["lastDate"] = date.isoformat()
+
+
+def rebuild_summaries(participant_ids=None, batch_size=5000):
+    """Recompute summaries from TestResult, for everyone or the given participants; returns rows written."""
+    results = TestResult.objects.all()
+    by_participant = {}
+    if participant_ids is not None:
+        results = results.filter(participant_id__in=participant_ids)
+        # An empty row still saves the next read from scanning results again.
+        for participant_id in User.objects.filter(id__in=participant_ids).values_list("id", flat=True):
+            by_participant[participant_id] = {}
+    # Compacted demo attempts are older than any stored result, so they go in first.
+    compacted = DemoAttempt.objects.filter(compacted_count__gt=0)
+    if participant_ids is not None:
+        compacted = compacted.filter(participant_id__in=participant_ids)
+    for c in compacted:
+        by_participant.setdefault(c.participant_id, {})[str(c.module_id)] = {
+            "attempts": c.compacted_count,
+            "passedAttempts": c.compacted_passed,
+            "bestScore": c.compacted_best_score,
+            "lastScore": c.compacted_last_score,
+            "lastResultId": None,
+            "lastDate": c.compacted_last_date.isoformat(),
+        }
+    columns = ("participant_id", "id", "module_id", "score", "is_passed", "date")
+    for participant_id, *row in results.order_by("id").values_list(*columns).iterator(chunk_size=batch_size):
+        _add(by_participant.setdefault(participant_id, {}), *row)
+
+    summaries = [ParticipantSummary(participant_id=p, modules=modules) for p, modules in by_participant.items()]
+    with transaction.atomic():
+        if participant_ids is None:
+            ParticipantSummary.objects.all().delete()
+        ParticipantSummary.objects.bulk_create(
+            summaries,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["participant"],
+            update_fields=["modules", "updated_at"],
+        )
+    return len(summaries)
+
+
+def invalidate_summaries(participant_ids=None):
+    """Drop summaries after results were changed in bulk; each is rebuilt on its next read."""
+    stale = ParticipantSummary.objects.all()
+    if participant_ids is not None:
+        stale = stale.filter(participant_id__in=participant_ids)
+    stale.delete()
+
+
+@transaction.atomic
+def record_result(result):
+    """Fold a just-created result into its participant's summary."""
+    summary = ParticipantSummary.objects.select_for_update().filter(participant_id=result.participant_id).first()
+    if summary is None:
+        # The rebuild reads the new result too.
+        rebuild_summaries([result.participant_id])
+        return
+    if summary.modules.get(str(result.module_id), {}).get("lastResultId") == result.id:
+        return
+    _add(summary.modules, result.id, result.module_id, result.score, result.is_passed, result.date)
+    summary.save(update_fields=["modules", "updated_at"])
+
+
+def participant_summary(participant_id):
+    """Dashboard payload: one summary row, module names and flags from the blueprint cache."""
+    summary = ParticipantSummary.objects.filter(participant_id=participant_id).first()
+    if summary is None:
+        rebuild_summaries([participant_id])
+        summary = ParticipantSummary.objects.filter(participant_id=participant_id).first()
+    entries = summary.modules if summary else {}
+
+    modules = []
+    for key, entry in entries.items():
+        bp = blueprints.get(int(key))
+        if bp is None:
+            continue
+        modules.append(
+            {
+                "moduleId": bp.id,
+                "moduleName": bp.name,
+                "isDemo": bp.is_demo,
+                "attempts": entry["attempts"],
+                "bestScore": entry["bestScore"],
+                "lastScore": entry["lastScore"],
+                "lastResultId": entry["lastResultId"],
+                "lastDate": _datetime(parse_datetime(entry["lastDate"])),
+                "isPassed": entry["passedAttempts"] > 0,
+                "remainingAttempts": max(0, DEMO_MAX_ATTEMPTS - entry["attempts"]) if bp.is_demo else None,
+            }
+        )
+    modules.sort(key=lambda m: m["lastDate"], reverse=True)
+    return {
+        "participantId": participant_id,
+        "demoMaxAttempts": DEMO_MAX_ATTEMPTS,
+        "modules": modules,
+        "updatedAt": _datetime(summary.updated_at) if summary else None,
+    }
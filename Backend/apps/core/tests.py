@@ -0,0 +1,247 @@
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User, UserRole
+from .analytics import unpack_answers
+from .fast_serializers import snapshot_rows
+from .paginators import EstimatedCountPaginator
+from .models import (
+    Group,
+    IdempotencyKey,
+    MainAttempt,
+    Module,
+    ModuleSubjectConfig,
+    Question,
+    ResultAnswers,
+    Subject,
+    TestResult,
+)
+from .search import get_search_backend
+from .serializers import SnapshotSerializer
+from .views import _build_snapshot_payload
+
+
+class SubmitTestViewTests(APITestCase):
+    def setUp(self):
+        group = Group.objects.create(name="G-1")
+        subject = Subject.objects.create(name="Fan")
+        self.module = Module.objects.create(name="Modul", points_per_answer=5, passing_score=5)
+        self.module.groups.add(group)
+        ModuleSubjectConfig.objects.create(module=self.module, subject=subject, question_count=2)
+        self.questions = [
+            Question.objects.create(subject=subject, text=f"Savol {i}", option_a="a", option_b="b", option_c="c", option_d="d")
+            for i in range(2)
+        ]
+        self.user = User.objects.create_user(username="t1", password="123", role=UserRole.PARTICIPANT, group=group)
+        self.client.force_authenticate(self.user)
+
+    def test_out_of_range_answer_counts_as_unanswered(self):
+        first, second = self.questions
+        response = self.client.post(
+            "/api/tests/submit/",
+            {"moduleId": self.module.id, "answers": {str(first.id): 300, str(second.id): 0}},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        result = TestResult.objects.get(participant=self.user)
+        self.assertEqual((result.correct_answers, result.total_questions), (1, 2))
+        packed = unpack_answers(ResultAnswers.objects.get(result=result).data)
+        self.assertEqual({int(r["question_id"]): int(r["chosen"]) for r in packed}, {first.id: -1, second.id: 0})
+
+    def submit(self, key, module_id=None, answer=0):
+        answers = {str(q.id): answer for q in self.questions}
+        return self.client.post(
+            "/api/tests/submit/",
+            {"moduleId": module_id or self.module.id, "answers": answers},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_with_same_key_replays_first_response(self):
+        first = self.submit("k-1")
+        retry = self.submit("k-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(TestResult.objects.filter(participant=self.user).count(), 1)
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.assertEqual(self.submit("k-1").status_code, 201)
+
+        self.assertEqual(self.submit("k-1", answer=1).status_code, 422)
+        self.assertEqual(self.submit("k-1", module_id=self.module.id + 1).status_code, 422)
+        self.assertEqual(TestResult.objects.filter(participant=self.user).count(), 1)
+
+    def test_error_response_is_not_stored(self):
+        response = self.client.post("/api/tests/submit/", {"answers": {}}, format="json", HTTP_IDEMPOTENCY_KEY="k-1")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.filter(key="k-1").exists())
+        self.assertEqual(self.submit("k-1").status_code, 201)
+
+    def test_concurrent_main_submits_reserve_one_attempt(self):
+        # Both requests pass the main_taken guard before either commits; the MainAttempt unique index decides.
+        with mock.patch("apps.core.views.main_taken", return_value=False):
+            first = self.submit("k-1")
+            second = self.submit("k-2")
+
+        self.assertEqual((first.status_code, second.status_code), (201, 400))
+        self.assertEqual(TestResult.objects.filter(participant=self.user).count(), 1)
+        self.assertEqual(MainAttempt.objects.filter(participant=self.user, module=self.module).count(), 1)
+
+
+class DatabaseProfileTests(APITestCase):
+    """Runs against the active DB_PROFILE; `DB_PROFILE=postgres python manage.py test apps` checks PostgreSQL."""
+
+    def setUp(self):
+        group = Group.objects.create(name="Profile check")
+        subject = Subject.objects.create(name="Profile check")
+        self.module = Module.objects.create(name="Profile check", passing_score=5)
+        self.module.groups.add(group)
+        ModuleSubjectConfig.objects.create(module=self.module, subject=subject, question_count=2)
+        for i in range(2):
+            Question.objects.create(subject=subject, text=f"Savol {i}", option_a="a", option_b="b", option_c="c", option_d="d")
+        User.objects.create_user(username="profile_admin", password="check-123", full_name="Check", role=UserRole.ADMIN)
+        User.objects.create_user(
+            username="profile_user", password="check-123", full_name="Check", role=UserRole.PARTICIPANT, group=group
+        )
+
+    def login(self, username):
+        response = self.client.post("/api/auth/login/", {"username": username, "password": "check-123"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite profile")
+    def test_sqlite_pragmas(self):
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for pragma in ("synchronous", "busy_timeout", "temp_store"):
+                cursor.execute(f"PRAGMA {pragma}")
+                pragmas[pragma] = cursor.fetchone()[0]
+        # synchronous=NORMAL is 1, temp_store=MEMORY is 2. The in-memory test database has no WAL journal.
+        self.assertEqual(pragmas, {"synchronous": 1, "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS, "temp_store": 2})
+
+    def test_core_endpoints(self):
+        self.login("profile_user")
+        self.assertEqual(self.client.get("/api/tests/available/").status_code, 200)
+        exam = self.client.post("/api/tests/start/", {"moduleId": self.module.id}, format="json")
+        self.assertEqual(exam.status_code, 200)
+        answers = {str(q["id"]): 0 for q in exam.data["questions"]}
+        submit = self.client.post("/api/tests/submit/", {"moduleId": self.module.id, "answers": answers}, format="json")
+        self.assertEqual(submit.status_code, 201)
+        self.assertEqual(self.client.get("/api/snapshot/").status_code, 200)
+
+        self.login("profile_admin")
+        snapshot = self.client.get("/api/snapshot/")
+        self.assertEqual(snapshot.status_code, 200)
+        search = self.client.get("/api/questions/search/?q=savol")
+        self.assertEqual(search.status_code, 200)
+        self.assertEqual(self.client.post("/api/snapshot/sync/", snapshot.data, format="json").status_code, 200)
+
+
+class FastSerializerTests(APITestCase):
+    """The `.values()` read path must render the same JSON as the serializers."""
+
+    def setUp(self):
+        group = Group.objects.create(name="G-1")
+        Group.objects.create(name="Arxiv", is_archived=True)
+        for is_demo in (False, True):
+            subject = Subject.objects.create(name=f"Fan {is_demo}", is_demo=is_demo)
+            module = Module.objects.create(name=f"Modul {is_demo}", is_demo=is_demo, randomize=is_demo)
+            module.groups.add(group)
+            ModuleSubjectConfig.objects.create(
+                module=module, subject=subject, question_count=1, difficulty_mix={"easy": 50, "hard": 50} if is_demo else None
+            )
+            Question.objects.create(subject=subject, text="Savol", option_a="a", option_b="b", option_c="c", option_d="d", correct_index=2)
+            deleted = Module.objects.create(name=f"O'chirilgan {is_demo}", is_demo=is_demo)
+            deleted.groups.add(group)
+            deleted.soft_delete()
+        self.users = [
+            User.objects.create_user(username="admin", password="123", role=UserRole.ADMIN),
+            User.objects.create_user(username="manager", password="123", role=UserRole.MANAGER, workplace="Maktab"),
+            User.objects.create_user(username="t1", password="123", full_name="T Bir", role=UserRole.PARTICIPANT, group=group),
+        ]
+        for module in Module.objects.all():
+            TestResult.objects.create(
+                participant=self.users[2], module=module, group=group, correct_answers=1, total_questions=1, score=5,
+                is_passed=True, time_taken=None if module.is_demo else 42,
+            )
+
+    def test_snapshot_rows_match_serializer(self):
+        render = JSONRenderer().render
+        for user in self.users:
+            expected = SnapshotSerializer(_build_snapshot_payload(user)).data
+            actual = snapshot_rows(_build_snapshot_payload(user))
+            self.assertEqual(list(actual), list(expected))
+            for key in expected:
+                with self.subTest(user=user.username, key=key):
+                    self.assertTrue(expected[key])
+                    self.assertEqual(render(actual[key]), render(expected[key]))
+
+
+@mock.patch("apps.core.paginators.EXACT_COUNT_LIMIT", 5)
+class EstimatedCountPaginatorTests(APITestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name="Fan")
+        Question.objects.bulk_create(
+            Question(subject=subject, text=f"Savol {i}", option_a="a", option_b="b", option_c="c", option_d="d")
+            for i in range(23)
+        )
+        self.filtered = Question.objects.filter(subject=subject).order_by("id")
+
+    def test_filtered_list_counts_on_past_the_limit(self):
+        paginator = EstimatedCountPaginator(self.filtered, 2)
+
+        self.assertEqual((paginator.count, paginator.capped), (6, True))
+        page = paginator.page(5)
+        self.assertEqual((len(page.object_list), paginator.count, paginator.num_pages), (2, 11, 6))
+        self.assertTrue(paginator.capped)
+
+        page = paginator.page(12)
+        self.assertEqual((len(page.object_list), paginator.count, paginator.capped), (1, 23, False))
+
+    def test_filtered_page_past_the_end_serves_the_last_page(self):
+        paginator = EstimatedCountPaginator(self.filtered, 2)
+
+        page = paginator.page(40)
+        self.assertEqual((page.number, len(page.object_list), paginator.count), (12, 1, 23))
+
+
+class SoftDeleteTests(APITestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name="G-1")
+        self.subject = Subject.objects.create(name="Fan")
+        self.module = Module.objects.create(name="Modul")
+        self.module.groups.add(self.group)
+        ModuleSubjectConfig.objects.create(module=self.module, subject=self.subject, question_count=1)
+        Question.objects.create(subject=self.subject, text="Savol", option_a="a", option_b="b", option_c="c", option_d="d")
+        admin = User.objects.create_superuser(username="root", password="123", role=UserRole.ADMIN)
+        self.client.force_login(admin)
+
+    def test_subject_soft_delete_retires_questions_and_configs(self):
+        self.assertEqual(get_search_backend().search("savol")[1], 1)
+
+        Subject.objects.filter(id=self.subject.id).soft_delete()
+
+        self.assertFalse(Question.objects.filter(subject=self.subject).exists())
+        self.assertEqual(get_search_backend().search("savol"), ([], 0))
+        self.assertFalse(ModuleSubjectConfig.objects.filter(subject=self.subject).exists())
+
+    def test_admin_delete_tombstones(self):
+        response = self.client.post(f"/admin/core/subject/{self.subject.id}/delete/", {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(
+            "/admin/core/group/", {"action": "delete_selected", "_selected_action": [self.group.id], "post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+
+        self.assertIsNotNone(Subject.all_objects.get(id=self.subject.id).deleted_at)
+        self.assertIsNotNone(Group.all_objects.get(id=self.group.id).deleted_at)
+        self.assertEqual(Question.all_objects.filter(subject=self.subject, deleted_at__isnull=False).count(), 1)
+        self.assertTrue(Module.groups.through.objects.filter(module=self.module, group=self.group).exists())
@@ -7,11 +7,25 @@ from .views import (
     QuestionViewSet,
     SubjectViewSet,
     TestResultViewSet,
+    archive_results_view,
+    archive_summary_view,
+    autosave_test_view,
     available_tests_view,
+    batch_view,
+    leaderboard_view,
+    live_monitor_view,
+    profiling_arm_view,
+    profiling_capture_view,
+    profiling_disarm_view,
+    profiling_summary_view,
+    profiling_view,
+    ready_view,
+    slow_queries_view,
     snapshot_view,
     start_test_view,
     submit_test_view,
     sync_snapshot_view,
+    test_summary_view,
 )
 
 router = DefaultRouter()
@@ -25,7 +39,21 @@ urlpatterns = [
     path("", include(router.urls)),
     path("tests/available/", available_tests_view),
     path("tests/start/", start_test_view),
+    path("tests/autosave/", autosave_test_view),
     path("tests/submit/", submit_test_view),
+    path("tests/summary/", test_summary_view),
     path("snapshot/", snapshot_view),
     path("snapshot/sync/", sync_snapshot_view),
+    path("batch/", batch_view),
+    path("ready/", ready_view),
+    path("leaderboard/", leaderboard_view),
+    path("archive/", archive_summary_view),
+    path("archive/results/", archive_results_view),
+    path("live/", live_monitor_view),
+    path("slow-queries/", slow_queries_view),
+    path("profiling/", profiling_view),
+    path("profiling/arm/", profiling_arm_view),
+    path("profiling/disarm/", profiling_disarm_view),
+    path("profiling/<str:name>/", profiling_capture_view),
+    path("profiling/<str:name>/summary/", profiling_summary_view),
 ]
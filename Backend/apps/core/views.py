@@ -1,24 +1,59 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 
 from apps.accounts.models import User
+from apps.accounts.permissions import IsAdminOrManagerRole
+from . import profiling, slow_queries, warmup
+from .analytics import OPTION_COUNT, pack_answers
+from .archive import read_archived
+from .batch import BatchError, BatchRunner
+from .blueprints import blueprints
+from .db_routing import ReplicaReadMixin, replica_read
+from .demo_attempts import attempts_used, recount_attempts, reserve_attempt
+from .drafts import DRAFT_MAX_ANSWERS, drafts
+from .events import bus, encode_sse
+from .fast_serializers import FastListMixin, group_rows, module_rows, question_rows, result_rows, snapshot_rows, subject_rows
+from .idempotency import idempotent
+from .leaderboard import NO_TIME, leaderboards, rebuild_entries
 from .models import Group, Module, Question, Subject, TestResult
-from .models import ModuleSubjectConfig
+from .models import ArchivedResultSummary, ModuleSubjectConfig, QuestionStats, ResultAnswers
 from .permissions import IsAdminOnly, IsParticipantOnly
+from .sampling import clean_mix, sampling_index
+from .search import get_search_backend
 from .serializers import (
     GroupSerializer,
     ModuleSerializer,
     QuestionSerializer,
-    SnapshotSerializer,
+    QuestionStatsSerializer,
     SubjectSerializer,
     TestResultSerializer,
 )
-from .services import pick_questions_for_module
+from .services import (
+    main_taken,
+    paper_payload,
+    pick_questions_for_module,
+    release_main_attempts,
+    reserve_main_attempt,
+    taken_main_modules,
+    upsert_questions,
+)
+from .summaries import DEMO_MAX_ATTEMPTS, invalidate_summaries, participant_summary, record_result
 
-DEMO_MAX_ATTEMPTS = 5
+LIVE_HEARTBEAT_SECONDS = 15
+QUESTION_SEARCH_MAX_PAGE_SIZE = 100
+ARCHIVE_MAX_PAGE_SIZE = 10000
+LEADERBOARD_MAX_PAGE_SIZE = 200
 
 
 def _to_bool(v, default=False):
@@ -38,15 +73,22 @@ def _to_int(v, default=None):
         return default
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class SoftDeleteMixin:
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+
+class GroupViewSet(FastListMixin, SoftDeleteMixin, viewsets.ModelViewSet):
     queryset = Group.objects.prefetch_related("modules").all().order_by("-id")
     serializer_class = GroupSerializer
     permission_classes = [IsAdminOnly]
+    fast_rows = group_rows
 
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(FastListMixin, SoftDeleteMixin, viewsets.ModelViewSet):
     serializer_class = SubjectSerializer
     permission_classes = [IsAdminOnly]
+    fast_rows = subject_rows
 
     def get_queryset(self):
         is_demo = self.request.query_params.get("is_demo")
@@ -63,9 +105,11 @@ class SubjectViewSet(viewsets.ModelViewSet):
         serializer.save(is_demo=str(is_demo).lower() in {"1", "true", "yes"})
 
 
-class ModuleViewSet(viewsets.ModelViewSet):
+class ModuleViewSet(ReplicaReadMixin, FastListMixin, SoftDeleteMixin, viewsets.ModelViewSet):
     serializer_class = ModuleSerializer
     permission_classes = [IsAdminOnly]
+    fast_rows = module_rows
+    replica_actions = ("item_stats",)
 
     def get_queryset(self):
         is_demo = self.request.query_params.get("is_demo")
@@ -81,10 +125,17 @@ class ModuleViewSet(viewsets.ModelViewSet):
             return
         serializer.save(is_demo=str(is_demo).lower() in {"1", "true", "yes"})
 
+    @action(detail=True, methods=["get"], url_path="item-stats")
+    def item_stats(self, request, pk=None):
+        module = self.get_object()
+        stats = QuestionStats.objects.filter(module=module).order_by("question_id")
+        return Response(QuestionStatsSerializer(stats, many=True).data)
+
 
-class QuestionViewSet(viewsets.ModelViewSet):
+class QuestionViewSet(FastListMixin, SoftDeleteMixin, viewsets.ModelViewSet):
     serializer_class = QuestionSerializer
     permission_classes = [IsAdminOnly]
+    fast_rows = question_rows
 
     def get_queryset(self):
         qs = Question.objects.select_related("subject").all().order_by("-id")
@@ -96,13 +147,38 @@ class QuestionViewSet(viewsets.ModelViewSet):
             qs = qs.filter(subject_id=subject_id)
         return qs
 
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        params = request.query_params
+        page = max(1, _to_int(params.get("page"), 1))
+        page_size = min(QUESTION_SEARCH_MAX_PAGE_SIZE, max(1, _to_int(params.get("page_size"), 20)))
+        is_demo = params.get("is_demo")
+        ids, total = get_search_backend().search(
+            params.get("q", ""),
+            subject_id=_to_int(params.get("subject_id")),
+            is_demo=None if is_demo is None else _to_bool(is_demo),
+            offset=(page - 1) * page_size,
+            limit=page_size,
+        )
+        by_id = Question.objects.in_bulk(ids)
+        return Response(
+            {
+                "count": total,
+                "page": page,
+                "pageSize": page_size,
+                "results": QuestionSerializer([by_id[i] for i in ids if i in by_id], many=True).data,
+            }
+        )
+
 
-class TestResultViewSet(viewsets.ReadOnlyModelViewSet):
+class TestResultViewSet(ReplicaReadMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = TestResultSerializer
     permission_classes = [IsAuthenticated]
+    fast_rows = result_rows
+    replica_actions = ("list", "retrieve")
 
     def get_queryset(self):
-        qs = TestResult.objects.select_related("participant", "module", "group").all()
+        qs = TestResult.objects.select_related("participant", "module", "group").filter(module__deleted_at__isnull=True)
         user = self.request.user
         if user.role in {"ADMIN", "MANAGER"}:
             return qs
@@ -119,8 +195,8 @@ def _build_snapshot_payload(user):
         demo_modules = Module.objects.filter(is_demo=True).prefetch_related("groups", "subject_configs").order_by("-id")
         questions = Question.objects.filter(subject__is_demo=False).order_by("-id")
         demo_questions = Question.objects.filter(subject__is_demo=True).order_by("-id")
-        results = TestResult.objects.filter(module__is_demo=False).order_by("-date")
-        demo_results = TestResult.objects.filter(module__is_demo=True).order_by("-date")
+        results = TestResult.objects.filter(module__is_demo=False, module__deleted_at__isnull=True).order_by("-date")
+        demo_results = TestResult.objects.filter(module__is_demo=True, module__deleted_at__isnull=True).order_by("-date")
     else:
         group_id = user.group_id
         users = User.objects.filter(id=user.id)
@@ -134,8 +210,8 @@ def _build_snapshot_payload(user):
         demo_subjects = Subject.objects.filter(id__in=subject_ids, is_demo=True).order_by("-id")
         questions = Question.objects.filter(subject__in=subjects).order_by("-id")
         demo_questions = Question.objects.filter(subject__in=demo_subjects).order_by("-id")
-        results = TestResult.objects.filter(participant=user, module__is_demo=False).order_by("-date")
-        demo_results = TestResult.objects.filter(participant=user, module__is_demo=True).order_by("-date")
+        results = TestResult.objects.filter(participant=user, module__is_demo=False, module__deleted_at__isnull=True).order_by("-date")
+        demo_results = TestResult.objects.filter(participant=user, module__is_demo=True, module__deleted_at__isnull=True).order_by("-date")
 
     return {
         "users": users,
@@ -153,46 +229,36 @@ def _build_snapshot_payload(user):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsParticipantOnly])
+@replica_read
 def available_tests_view(request):
     user = request.user
     group_id = user.group_id
     if not group_id:
         return Response({"main": [], "demo": []})
 
-    main_modules = Module.objects.filter(is_demo=False, is_active=True, groups__id=group_id).distinct()
-    demo_modules = Module.objects.filter(is_demo=True, is_active=True, groups__id=group_id).distinct()
-    taken_main = set(TestResult.objects.filter(participant=user, module__is_demo=False).values_list("module_id", flat=True))
+    modules = [bp for bp in blueprints.for_group(group_id) if bp.is_active]
+    taken_main = taken_main_modules(user.id)
 
     return Response(
         {
             "main": [
                 {
-                    "id": m.id,
-                    "name": m.name,
-                    "alreadyTaken": m.id in taken_main,
-                    "settings": {
-                        "pointsPerAnswer": m.points_per_answer,
-                        "durationMinutes": m.duration_minutes,
-                        "passingScore": m.passing_score,
-                        "randomize": m.randomize,
-                        "isActive": m.is_active,
-                    },
+                    "id": bp.id,
+                    "name": bp.name,
+                    "alreadyTaken": bp.id in taken_main,
+                    "settings": bp.settings_payload(),
                 }
-                for m in main_modules
+                for bp in modules
+                if not bp.is_demo
             ],
             "demo": [
                 {
-                    "id": m.id,
-                    "name": m.name,
-                    "settings": {
-                        "pointsPerAnswer": m.points_per_answer,
-                        "durationMinutes": m.duration_minutes,
-                        "passingScore": m.passing_score,
-                        "randomize": m.randomize,
-                        "isActive": m.is_active,
-                    },
+                    "id": bp.id,
+                    "name": bp.name,
+                    "settings": bp.settings_payload(),
                 }
-                for m in demo_modules
+                for bp in modules
+                if bp.is_demo
             ],
         }
     )
@@ -200,100 +266,204 @@ def available_tests_view(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsParticipantOnly])
+@idempotent
 def start_test_view(request):
     module_id = request.data.get("moduleId")
     if not module_id:
         return Response({"detail": "moduleId kerak"}, status=status.HTTP_400_BAD_REQUEST)
 
-    module = Module.objects.prefetch_related("subject_configs").filter(id=module_id, is_active=True).first()
-    if not module:
+    module = blueprints.get(_to_int(module_id))
+    if not module or not module.is_active:
         return Response({"detail": "Test topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
-    if module.is_demo and TestResult.objects.filter(participant=request.user, module=module).count() >= DEMO_MAX_ATTEMPTS:
+    if module.is_demo and attempts_used(request.user.id, module.id) >= DEMO_MAX_ATTEMPTS:
         return Response({"detail": "Sizda limit tugadi"}, status=status.HTTP_400_BAD_REQUEST)
-    if not module.is_demo and TestResult.objects.filter(participant=request.user, module=module).exists():
+    if not module.is_demo and main_taken(request.user.id, module.id):
         return Response({"detail": "Bu test allaqachon topshirilgan"}, status=status.HTTP_400_BAD_REQUEST)
-    if request.user.group_id is None or not module.groups.filter(id=request.user.group_id).exists():
+    if request.user.group_id is None or request.user.group_id not in module.group_ids:
         return Response({"detail": "Siz bu testga biriktirilmagansiz"}, status=status.HTTP_403_FORBIDDEN)
 
-    questions = pick_questions_for_module(module)
+    # A restart (crash, reload) gets the paper already issued, with its autosaved answers.
+    paper, draft = drafts.load(request.user.id, module.id)
+    if paper:
+        questions = paper_payload(paper)
+    else:
+        questions = pick_questions_for_module(module)
+        drafts.issue(request.user.id, module.id, [q["id"] for q in questions])
+    bus.session_started(module.id, request.user.group_id)
     return Response(
         {
             "moduleId": module.id,
             "moduleName": module.name,
             "isDemo": module.is_demo,
-            "settings": {
-                "pointsPerAnswer": module.points_per_answer,
-                "durationMinutes": module.duration_minutes,
-                "passingScore": module.passing_score,
-                "randomize": module.randomize,
-                "isActive": module.is_active,
-            },
+            "settings": module.settings_payload(),
             "questions": questions,
+            "draft": {str(k): v for k, v in draft.items()},
         }
     )
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsParticipantOnly])
+def autosave_test_view(request):
+    module_id = _to_int(request.data.get("moduleId"))
+    answers = request.data.get("answers")
+    if not module_id or not isinstance(answers, dict) or len(answers) > DRAFT_MAX_ANSWERS:
+        return Response({"detail": "moduleId va answers kerak"}, status=status.HTTP_400_BAD_REQUEST)
+
+    module = blueprints.get(module_id)
+    if not module or not module.is_active:
+        return Response({"detail": "Test topilmadi"}, status=status.HTTP_404_NOT_FOUND)
+    if request.user.group_id is None or request.user.group_id not in module.group_ids:
+        return Response({"detail": "Siz bu testga biriktirilmagansiz"}, status=status.HTTP_403_FORBIDDEN)
+
+    delta = {}
+    for key, chosen in answers.items():
+        question_id, chosen = _to_int(key), _to_int(chosen)
+        if question_id is None or chosen is None or not -1 <= chosen < OPTION_COUNT:
+            return Response({"detail": "answers noto'g'ri"}, status=status.HTTP_400_BAD_REQUEST)
+        delta[question_id] = chosen
+    # Ids that are not live questions of this module are dropped, not stored.
+    live = sampling_index.live(module.subject_ids, delta)
+    delta = {question_id: chosen for question_id, chosen in delta.items() if question_id in live}
+    drafts.save(request.user.id, module.id, delta)
+    return Response({"saved": len(delta)}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsParticipantOnly])
+@idempotent
 def submit_test_view(request):
     module_id = request.data.get("moduleId")
     answers = request.data.get("answers", {})
     time_taken = request.data.get("timeTaken")
 
-    if not module_id or not isinstance(answers, dict) or not answers:
+    if not module_id or not isinstance(answers, dict):
         return Response({"detail": "moduleId va answers kerak"}, status=status.HTTP_400_BAD_REQUEST)
 
-    module = Module.objects.filter(id=module_id, is_active=True).first()
-    if not module:
+    module = blueprints.get(_to_int(module_id))
+    if not module or not module.is_active:
         return Response({"detail": "Test topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
-    if module.is_demo and TestResult.objects.filter(participant=request.user, module=module).count() >= DEMO_MAX_ATTEMPTS:
-        return Response({"detail": "Sizda limit tugadi"}, status=status.HTTP_400_BAD_REQUEST)
-    if not module.is_demo and TestResult.objects.filter(participant=request.user, module=module).exists():
+    if not module.is_demo and main_taken(request.user.id, module.id):
         return Response({"detail": "Bu test allaqachon topshirilgan"}, status=status.HTTP_400_BAD_REQUEST)
-    if request.user.group_id is None or not module.groups.filter(id=request.user.group_id).exists():
+    if request.user.group_id is None or request.user.group_id not in module.group_ids:
         return Response({"detail": "Siz bu testga biriktirilmagansiz"}, status=status.HTTP_403_FORBIDDEN)
 
+    # Autosaved answers fill in whatever the client no longer has.
+    paper, draft = drafts.load(request.user.id, module.id)
+    answers = {**{str(k): v for k, v in draft.items()}, **{str(k): v for k, v in answers.items()}}
+    if not answers:
+        return Response({"detail": "moduleId va answers kerak"}, status=status.HTTP_400_BAD_REQUEST)
+
     try:
         question_ids = [int(k) for k in answers.keys()]
     except ValueError:
         return Response({"detail": "answers keylari savol ID bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    if paper:
+        issued = set(paper)
+        question_ids = [qid for qid in question_ids if qid in issued]
 
-    allowed_subject_ids = module.subject_configs.values_list("subject_id", flat=True)
-    questions = Question.objects.filter(id__in=question_ids, subject_id__in=allowed_subject_ids)
-    if questions.count() != len(question_ids):
-        return Response({"detail": "Ba'zi savollar topilmadi"}, status=status.HTTP_400_BAD_REQUEST)
+    # Ids that no longer resolve (deleted meanwhile, not in this module) are dropped, not fatal.
+    questions = list(Question.objects.filter(id__in=question_ids, subject_id__in=module.subject_ids))
+    if not questions:
+        return Response({"detail": "Savollar topilmadi"}, status=status.HTTP_400_BAD_REQUEST)
 
     correct = 0
+    answer_pairs = []
+    outcomes = []
     for q in questions:
-        chosen = answers.get(str(q.id), answers.get(q.id))
-        if chosen is not None and int(chosen) == q.correct_index:
+        chosen = _to_int(answers.get(str(q.id), answers.get(q.id)))
+        # Anything but a valid option index counts as unanswered (the packed field is int8).
+        if chosen is None or not -1 <= chosen < OPTION_COUNT:
+            chosen = -1
+        if chosen == q.correct_index:
             correct += 1
+        answer_pairs.append((q.id, chosen))
+        outcomes.append((q.subject_id, q.id, chosen == q.correct_index))
 
-    total = len(question_ids)
+    total = len(questions)
     score = correct * module.points_per_answer
     is_passed = score >= module.passing_score
 
-    result = TestResult.objects.create(
-        participant=request.user,
-        module=module,
-        group=request.user.group,
-        correct_answers=correct,
-        total_questions=total,
-        score=score,
-        is_passed=is_passed,
-        time_taken=int(time_taken) if time_taken is not None else None,
-    )
+    with transaction.atomic():
+        # Atomic reservations: concurrent submits cannot both take the last demo attempt or the one main attempt.
+        if module.is_demo and not reserve_attempt(request.user.id, module.id):
+            return Response({"detail": "Sizda limit tugadi"}, status=status.HTTP_400_BAD_REQUEST)
+        if not module.is_demo and not reserve_main_attempt(request.user.id, module.id):
+            return Response({"detail": "Bu test allaqachon topshirilgan"}, status=status.HTTP_400_BAD_REQUEST)
+        result = TestResult.objects.create(
+            participant=request.user,
+            module_id=module.id,
+            group_id=request.user.group_id,
+            correct_answers=correct,
+            total_questions=total,
+            score=score,
+            is_passed=is_passed,
+            time_taken=int(time_taken) if time_taken is not None else None,
+        )
+        ResultAnswers.objects.create(result=result, module_id=module.id, data=pack_answers(answer_pairs))
+        leaderboard_key = leaderboards.record(result)
+    drafts.discard(request.user.id, module.id)
+    transaction.on_commit(lambda: sampling_index.record(outcomes))
+
+    data = TestResultSerializer(result).data
+    transaction.on_commit(lambda: bus.result_created(data))
+    record_result(result)
+    standing = leaderboards.standing(module.id, request.user.group_id, request.user.id, leaderboard_key)
+    return Response({**data, "standing": standing}, status=status.HTTP_201_CREATED)
+
 
-    return Response(TestResultSerializer(result).data, status=status.HTTP_201_CREATED)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsParticipantOnly])
+def test_summary_view(request):
+    return Response(participant_summary(request.user.id))
+
+
+def _authenticate_stream(request):
+    # EventSource cannot send headers, so the access token may come as ?token=.
+    auth = JWTAuthentication()
+    raw = request.GET.get("token")
+    if not raw:
+        header = auth.get_header(request)
+        raw = auth.get_raw_token(header) if header else None
+    if not raw:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def live_monitor_view(request):
+    user = await sync_to_async(_authenticate_stream)(request)
+    if not user or user.role not in {"ADMIN", "MANAGER"}:
+        return JsonResponse({"detail": "Ruxsat yo'q"}, status=status.HTTP_403_FORBIDDEN)
+
+    async def stream():
+        queue = bus.subscribe()
+        try:
+            yield encode_sse("counts", bus.counts())
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+        finally:
+            bus.unsubscribe(queue)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@replica_read
 def snapshot_view(request):
     payload = _build_snapshot_payload(request.user)
-    return Response(SnapshotSerializer(payload).data)
+    return Response(snapshot_rows(payload))
 
 
 @api_view(["POST"])
@@ -321,8 +491,9 @@ def sync_snapshot_view(request):
                 "name": row.get("name", ""),
                 "is_archived": _to_bool(row.get("isArchived"), False),
             }
-            if gid and Group.objects.filter(id=gid).exists():
-                obj = Group.objects.get(id=gid)
+            obj = Group.all_objects.filter(id=gid).first() if gid else None
+            if obj:
+                obj.deleted_at = None
                 obj.name = defaults["name"]
                 obj.is_archived = defaults["is_archived"]
                 obj.save()
@@ -332,7 +503,7 @@ def sync_snapshot_view(request):
             group_map[str(row.get("id"))] = obj
             group_map[str(obj.id)] = obj
             group_module_links[obj.id] = row.get("moduleIds", [])
-        Group.objects.exclude(id__in=group_seen).delete()
+        Group.objects.exclude(id__in=group_seen).soft_delete()
 
         subject_seen = set()
         subject_map = {}
@@ -340,8 +511,9 @@ def sync_snapshot_view(request):
             sid = _to_int(row.get("id"))
             is_demo = row in demo_subjects_payload or _to_bool(row.get("isDemo"), False)
             defaults = {"name": row.get("name", ""), "is_demo": is_demo}
-            if sid and Subject.objects.filter(id=sid).exists():
-                obj = Subject.objects.get(id=sid)
+            obj = Subject.all_objects.filter(id=sid).first() if sid else None
+            if obj:
+                obj.deleted_at = None
                 obj.name = defaults["name"]
                 obj.is_demo = defaults["is_demo"]
                 obj.save()
@@ -350,10 +522,12 @@ def sync_snapshot_view(request):
             subject_seen.add(obj.id)
             subject_map[str(row.get("id"))] = obj
             subject_map[str(obj.id)] = obj
-        Subject.objects.exclude(id__in=subject_seen).delete()
+        Subject.objects.exclude(id__in=subject_seen).soft_delete()
 
         module_seen = set()
         module_map = {}
+        # Modules switched between demo and main: their attempt counters are recounted below.
+        demo_flipped = set()
         module_groups = {}
         module_subject_cfgs = {}
         for row in modules_payload + demo_modules_payload:
@@ -371,8 +545,11 @@ def sync_snapshot_view(request):
                 "randomize": _to_bool(settings.get("randomize"), True),
                 "is_active": _to_bool(settings.get("isActive"), True),
             }
-            if mid and Module.objects.filter(id=mid).exists():
-                obj = Module.objects.get(id=mid)
+            obj = Module.all_objects.filter(id=mid).first() if mid else None
+            if obj:
+                if obj.is_demo != defaults["is_demo"]:
+                    demo_flipped.add(obj.id)
+                obj.deleted_at = None
                 for k, v in defaults.items():
                     setattr(obj, k, v)
                 obj.save()
@@ -383,7 +560,7 @@ def sync_snapshot_view(request):
             module_map[str(obj.id)] = obj
             module_groups[obj.id] = row.get("groupIds") or []
             module_subject_cfgs[obj.id] = row.get("subjectConfigs") or []
-        Module.objects.exclude(id__in=module_seen).delete()
+        Module.objects.exclude(id__in=module_seen).soft_delete()
 
         for module_id, group_ids in module_groups.items():
             module = Module.objects.get(id=module_id)
@@ -405,39 +582,37 @@ def sync_snapshot_view(request):
                 if subject.id in seen_subject_ids:
                     continue
                 seen_subject_ids.add(subject.id)
+                try:
+                    mix = clean_mix(cfg.get("difficultyMix"))
+                except ValueError:
+                    mix = None
                 ModuleSubjectConfig.objects.create(
                     module=module,
                     subject=subject,
                     question_count=max(0, _to_int(cfg.get("questionCount"), 0)),
+                    difficulty_mix=mix,
                 )
 
-        question_seen = set()
+        question_rows_payload = []
         for row in questions_payload + demo_questions_payload:
-            qid = _to_int(row.get("id"))
             subject = subject_map.get(str(row.get("subjectId")))
-            if not subject:
-                continue
             options = row.get("options") or []
-            if len(options) != 4:
+            if not subject or len(options) != 4:
                 continue
-            defaults = {
-                "subject": subject,
-                "text": row.get("text", ""),
-                "option_a": options[0],
-                "option_b": options[1],
-                "option_c": options[2],
-                "option_d": options[3],
-                "correct_index": _to_int(row.get("correctIndex"), 0),
-            }
-            if qid and Question.objects.filter(id=qid).exists():
-                obj = Question.objects.get(id=qid)
-                for k, v in defaults.items():
-                    setattr(obj, k, v)
-                obj.save()
-            else:
-                obj = Question.objects.create(**defaults)
-            question_seen.add(obj.id)
-        Question.objects.exclude(id__in=question_seen).delete()
+            question_rows_payload.append(
+                {
+                    "id": _to_int(row.get("id")),
+                    "subject_id": subject.id,
+                    "text": row.get("text", ""),
+                    "options": options,
+                    "correct_index": _to_int(row.get("correctIndex"), 0),
+                }
+            )
+        questions, created, updated = upsert_questions(question_rows_payload)
+        stale_ids = sorted(set(Question.objects.values_list("id", flat=True)) - {q.id for q in questions})
+        for start in range(0, len(stale_ids), 500):
+            Question.objects.filter(id__in=stale_ids[start : start + 500]).soft_delete()
+        get_search_backend().index(created + updated)
 
         user_seen = set()
         user_map = {}
@@ -477,6 +652,9 @@ def sync_snapshot_view(request):
         User.objects.exclude(id__in=user_seen).exclude(id=request.user.id).delete()
 
         result_seen = set()
+        # (module, participant) pairs whose results were added, edited or removed: derived tables are resynced for these only.
+        touched = set()
+        result_fields = ("participant_id", "module_id", "group_id", "correct_answers", "total_questions", "score", "is_passed", "time_taken")
         for row in results_payload + demo_results_payload:
             rid = _to_int(row.get("id"))
             participant = user_map.get(str(row.get("participantId"))) or User.objects.filter(id=_to_int(row.get("participantId"))).first()
@@ -497,13 +675,191 @@ def sync_snapshot_view(request):
             }
             if rid and TestResult.objects.filter(id=rid).exists():
                 obj = TestResult.objects.get(id=rid)
+                before = [getattr(obj, f) for f in result_fields]
                 for k, v in defaults.items():
                     setattr(obj, k, v)
-                obj.save()
+                if [getattr(obj, f) for f in result_fields] != before:
+                    obj.save()
+                    touched.update({(before[1], before[0]), (obj.module_id, obj.participant_id)})
             else:
                 obj = TestResult.objects.create(**defaults)
+                touched.add((obj.module_id, obj.participant_id))
             result_seen.add(obj.id)
-        TestResult.objects.exclude(id__in=result_seen).delete()
+        removed = TestResult.objects.filter(module__deleted_at__isnull=True).exclude(id__in=result_seen)
+        removed_pairs = set(removed.values_list("module_id", "participant_id"))
+        release_main_attempts((p, m) for m, p in removed_pairs)
+        removed.delete()
+        touched |= removed_pairs
+        rebuild_entries(pairs=touched)
+        # Attempt counters only move when demo results come or go.
+        demo_ids = set(Module.all_objects.filter(id__in={m for m, _ in touched}, is_demo=True).values_list("id", flat=True))
+        demo_pairs = {(m, p) for m, p in touched if m in demo_ids}
+        if demo_pairs:
+            recount_attempts({m for m, _ in demo_pairs}, {p for _, p in demo_pairs})
+        if demo_flipped:
+            recount_attempts(demo_flipped)
+        if touched:
+            invalidate_summaries({participant_id for _, participant_id in touched})
 
     payload = _build_snapshot_payload(request.user)
-    return Response(SnapshotSerializer(payload).data)
+    return Response(snapshot_rows(payload))
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def ready_view(request):
+    ready = warmup.is_ready()
+    return Response({"ready": ready, **warmup.readiness()}, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOrManagerRole])
+def leaderboard_view(request):
+    params = request.query_params
+    module_id = _to_int(params.get("module_id"))
+    if not module_id:
+        return Response({"detail": "module_id kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    group_id = _to_int(params.get("group_id"))
+    page = max(1, _to_int(params.get("page"), 1))
+    page_size = min(LEADERBOARD_MAX_PAGE_SIZE, max(1, _to_int(params.get("page_size"), 50)))
+
+    board = leaderboards.board(module_id, group_id)
+    rows = board.page((page - 1) * page_size, page_size)
+    names = dict(User.objects.filter(id__in=[key[3] for _, key in rows]).values_list("id", "full_name"))
+    return Response(
+        {
+            "count": len(board),
+            "page": page,
+            "pageSize": page_size,
+            "results": [
+                {
+                    "rank": rank,
+                    "participantId": key[3],
+                    "fullName": names.get(key[3], ""),
+                    "score": -key[0],
+                    "timeTaken": None if key[1] == NO_TIME else key[1],
+                    "percentile": board.percentile(rank),
+                }
+                for rank, key in rows
+            ],
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOrManagerRole])
+@replica_read
+def archive_summary_view(request):
+    rows = (
+        ArchivedResultSummary.objects.values("module_id", "module_name", "group_id", "group_name")
+        .annotate(
+            results=Sum("result_count"),
+            passed=Sum("passed_count"),
+            score_sum=Sum("score_sum"),
+            first_date=Min("first_date"),
+            last_date=Max("last_date"),
+            files=Count("file_name", distinct=True),
+        )
+        .order_by("module_id", "group_id")
+    )
+    return Response(
+        [
+            {
+                "moduleId": row["module_id"],
+                "moduleName": row["module_name"],
+                "groupId": row["group_id"],
+                "groupName": row["group_name"],
+                "results": row["results"],
+                "passed": row["passed"],
+                "averageScore": row["score_sum"] / row["results"] if row["results"] else 0,
+                "firstDate": row["first_date"],
+                "lastDate": row["last_date"],
+                "files": row["files"],
+            }
+            for row in rows
+        ]
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOrManagerRole])
+def archive_results_view(request):
+    params = request.query_params
+    records = read_archived(
+        module_id=_to_int(params.get("module_id")),
+        group_id=_to_int(params.get("group_id")),
+        participant_id=_to_int(params.get("participant_id")),
+        limit=min(ARCHIVE_MAX_PAGE_SIZE, max(1, _to_int(params.get("limit"), 1000))),
+    )
+    for record in records:
+        record.pop("answers", None)
+    return Response(records)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def batch_view(request):
+    operations = (request.data or {}).get("operations")
+    if not isinstance(operations, list):
+        return Response({"detail": "operations ro'yxat bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        results = BatchRunner(request.user).run(operations)
+    except BatchError as exc:
+        return Response({"detail": exc.detail, "index": exc.index}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"results": results})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def profiling_view(request):
+    return Response({"armed": profiling.armed_state(), "captures": profiling.list_captures()})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def profiling_arm_view(request):
+    view_name = str(request.data.get("view") or "").strip()
+    if not view_name:
+        return Response({"detail": "view kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        sample_rate = float(request.data.get("sampleRate", 1.0))
+    except (TypeError, ValueError):
+        return Response({"detail": "sampleRate son bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    minutes = max(1, _to_int(request.data.get("minutes"), 15))
+    return Response({"armed": profiling.arm(view_name, sample_rate, minutes)})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def profiling_disarm_view(request):
+    profiling.disarm()
+    return Response({"armed": None})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def profiling_capture_view(request, name):
+    path = profiling.capture_path(name)
+    if not path:
+        return Response({"detail": "Topilmadi"}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def profiling_summary_view(request, name):
+    path = profiling.capture_path(name)
+    if not path:
+        return Response({"detail": "Topilmadi"}, status=status.HTTP_404_NOT_FOUND)
+    limit = max(1, _to_int(request.query_params.get("limit"), 30))
+    return HttpResponse(profiling.summarize(path, limit), content_type="text/plain; charset=utf-8")
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOnly])
+def slow_queries_view(request):
+    limit = min(200, max(1, _to_int(request.query_params.get("limit"), 20)))
+    order = request.query_params.get("order", "total")
+    if order not in slow_queries.TOP_ORDERS:
+        return Response({"detail": f"order {', '.join(slow_queries.TOP_ORDERS)} dan biri"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(slow_queries.report(limit, order))
@@ -0,0 +1,142 @@
+import importlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from apps.accounts.models import User
+from .blueprints import blueprints
+from .leaderboard import leaderboards
+from .models import Question
+from .sampling import sampling_index
+from .search import get_search_backend
+
+logger = logging.getLogger(__name__)
+
+# Otherwise imported by the first request that needs them.
+LAZY_IMPORTS = (
+    "numpy",
+    "apps.core.analytics",
+    "rest_framework.renderers",
+    "rest_framework_simplejwt.authentication",
+)
+
+_lock = threading.Lock()
+_state = {"status": "pending", "startedAt": None, "finishedAt": None, "steps": [], "error": None}
+
+
+def readiness():
+    with _lock:
+        return {**_state, "steps": list(_state["steps"])}
+
+
+def is_ready():
+    # Without the startup hook nothing will warm this process, so it never waits.
+    return _state["status"] == "ready" or (not settings.WARM_ON_STARTUP and _state["status"] == "pending")
+
+
+class _WarmUp:
+    def __init__(self, module_ids, report, database_only=False):
+        self.module_ids = set(module_ids or ())
+        self.report = report
+        self.database_only = database_only
+        self.modules = []
+
+    def step(self, name, fn):
+        started = time.perf_counter()
+        detail = fn()
+        step = {"step": name, "detail": detail, "ms": round((time.perf_counter() - started) * 1000, 1)}
+        with _lock:
+            _state["steps"].append(step)
+        if self.report:
+            self.report(step)
+
+    def connection(self):
+        connection.ensure_connection()
+        return connection.vendor
+
+    def imports(self):
+        for name in LAZY_IMPORTS:
+            importlib.import_module(name)
+        return f"{len(LAZY_IMPORTS)} ta modul"
+
+    def blueprints(self):
+        blueprints.invalidate()
+        self.modules = [
+            bp for bp in blueprints.all() if (bp.id in self.module_ids if self.module_ids else bp.is_active)
+        ]
+        return f"{len(self.modules)} ta modul"
+
+    def question_pools(self):
+        # The sampling pools start draws papers from, then the row pages paper_payload reads.
+        subject_ids = set().union(*(bp.subject_ids for bp in self.modules))
+        count = 0
+        for subject_id in subject_ids:
+            count += len(sampling_index.pool(subject_id).position)
+            len(Question.objects.filter(subject_id=subject_id).values_list("id", "text", "option_a", "option_b", "option_c", "option_d"))
+        return f"{len(subject_ids)} ta fan, {count} ta savol"
+
+    def principals(self):
+        # JWT authentication loads the user row on every request.
+        group_ids = set().union(*(bp.group_ids for bp in self.modules))
+        users = User.objects.filter(group_id__in=group_ids, is_active=True)
+        count = len(users.values_list("id", "username", "role", "group_id", "is_active"))
+        return f"{len(group_ids)} ta guruh, {count} ta foydalanuvchi"
+
+    def leaderboards(self):
+        count = 0
+        for bp in self.modules:
+            for group_id in (None, *bp.group_ids):
+                leaderboards.board(bp.id, group_id)
+                count += 1
+        return f"{count} ta reyting"
+
+    def search_index(self):
+        backend = get_search_backend()
+        backend.search("a", limit=1)
+        return type(backend).__name__
+
+    def run(self):
+        self.step("connection", self.connection)
+        if not self.database_only:
+            self.step("imports", self.imports)
+        self.step("blueprints", self.blueprints)
+        self.step("questionPools", self.question_pools)
+        self.step("principals", self.principals)
+        self.step("leaderboards", self.leaderboards)
+        self.step("searchIndex", self.search_index)
+
+
+def warm_up(module_ids=None, report=None, database_only=False):
+    """
+    Fill this process's caches for the active (or given) modules; `report`
+    gets each step as it finishes. With `database_only` the point is the
+    reads themselves: they pull the exam's table and index pages into the
+    database/OS page cache, which every process shares.
+    """
+    with _lock:
+        _state.update(status="warming", startedAt=timezone.now(), finishedAt=None, steps=[], error=None)
+    try:
+        _WarmUp(module_ids, report, database_only).run()
+    except Exception as exc:
+        with _lock:
+            _state.update(status="failed", finishedAt=timezone.now(), error=str(exc))
+        raise
+    with _lock:
+        _state.update(status="ready", finishedAt=timezone.now())
+    return readiness()
+
+
+def warm_up_in_background(module_ids=None):
+    def run():
+        try:
+            warm_up(module_ids)
+        except Exception:
+            logger.exception("Warm-up failed")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
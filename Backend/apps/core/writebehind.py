@@ -0,0 +1,79 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces per-key updates in memory and hands them to `write(pending)`
+    from a background thread every `interval()` seconds. Subclasses define
+    `merge`, `write` and `interval`.
+    """
+
+    name = "write-behind"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._thread = None
+        atexit.register(self._flush_on_exit)
+
+    def merge(self, old, new):
+        raise NotImplementedError
+
+    def write(self, pending):
+        raise NotImplementedError
+
+    def interval(self):
+        raise NotImplementedError
+
+    def add(self, key, value):
+        with self._lock:
+            self._pending[key] = self.merge(self._pending[key], value) if key in self._pending else value
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval())
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s flush failed", self.name)
+            finally:
+                close_old_connections()
+
+    def take(self, keys=None):
+        with self._lock:
+            if keys is None:
+                pending, self._pending = self._pending, {}
+                return pending
+            return {key: self._pending.pop(key) for key in keys if key in self._pending}
+
+    def flush(self, keys=None):
+        with self._flush_lock:
+            pending = self.take(keys)
+            if not pending:
+                return 0
+            try:
+                self.write(pending)
+            except Exception:
+                # Put the updates back, under anything that arrived meanwhile.
+                with self._lock:
+                    for key, value in pending.items():
+                        self._pending[key] = self.merge(value, self._pending[key]) if key in self._pending else value
+                raise
+            return len(pending)
+
+    def _flush_on_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("%s flush at exit failed", self.name)
@@ -3,3 +3,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARM_ON_STARTUP:
+    from apps.core.warmup import warm_up_in_background  # noqa: E402
+
+    warm_up_in_background()
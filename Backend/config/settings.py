@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,6 +40,24 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+MIDDLEWARE.append("apps.core.profiling.ProfilingMiddleware")
+PROFILE_DIR = os.getenv("PROFILE_DIR", BASE_DIR / "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "False").lower() == "true"
+if SERVER_TIMING:
+    MIDDLEWARE.insert(0, "apps.core.middleware.ServerTimingMiddleware")
+
+# Opt-in: queries slower than SLOW_QUERY_MS go to a rotating JSON-lines log with their view and plan.
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "False").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_DIR = os.getenv("SLOW_QUERY_DIR", BASE_DIR / "slow_queries")
+SLOW_QUERY_MAX_BYTES = int(os.getenv("SLOW_QUERY_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_BACKUPS = int(os.getenv("SLOW_QUERY_BACKUPS", "3"))
+SLOW_QUERY_EXPLAIN_SECONDS = int(os.getenv("SLOW_QUERY_EXPLAIN_SECONDS", "300"))
+if SLOW_QUERY_LOG:
+    MIDDLEWARE.append("apps.core.slow_queries.SlowQueryMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -59,11 +78,84 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+DB_PROFILE = os.getenv("DB_PROFILE", "sqlite").lower()
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "600"))
+
+if DB_PROFILE == "postgres":
+    # Requires psycopg 3 (`pip install "psycopg[binary,pool]"`).
+    DB_POOL = os.getenv("DB_POOL", "True").lower() == "true"
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "artedu"),
+            "USER": os.getenv("POSTGRES_USER", "artedu"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "127.0.0.1"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            # Django's pool and persistent connections are mutually exclusive.
+            "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+                    "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+                }
+            }
+            if DB_POOL
+            else {},
+        }
+    }
+    if os.getenv("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": os.getenv("POSTGRES_REPLICA_HOST"),
+            "PORT": os.getenv("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        }
+else:
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "20000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "OPTIONS": {
+                "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+                # Take the write lock at BEGIN so concurrent writers wait on busy_timeout
+                # instead of failing on a read-to-write lock upgrade.
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    # Takes effect on a new database file; existing ones: db_maintenance --enable-incremental-vacuum.
+                    "PRAGMA auto_vacuum=INCREMENTAL;"
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};"
+                    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                ),
+            },
+        }
     }
+    if os.getenv("SQLITE_REPLICA_PATH"):
+        # Local stand-in for a replica; refresh it with `python manage.py sync_sqlite_replica`.
+        DATABASES["replica"] = {**DATABASES["default"], "NAME": os.getenv("SQLITE_REPLICA_PATH")}
+
+if "replica" in DATABASES:
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["apps.core.db_routing.ReadReplicaRouter"]
+    MIDDLEWARE.append("apps.core.db_routing.ReplicaPinMiddleware")
+REPLICA_STALENESS_SECONDS = int(os.getenv("REPLICA_STALENESS_SECONDS", "5"))
+# Read-your-writes pins must be seen by every worker: Redis when REDIS_URL is set,
+# else a table on the primary (`python manage.py createcachetable`).
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "replica_pins": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.getenv("REDIS_URL")}
+        if os.getenv("REDIS_URL")
+        else {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "replica_pins"}
+    ),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -91,4 +183,30 @@ REST_FRAMEWORK = {
     ),
 }
 
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", BASE_DIR / "archive")
+# Server processes warm their caches in the background; /api/ready/ answers 503 until done.
+WARM_ON_STARTUP = os.getenv("WARM_ON_STARTUP", "False").lower() == "true"
+# How often each worker re-reads the shared data-version counters (apps.core.coherence).
+COHERENCE_CHECK_SECONDS = float(os.getenv("COHERENCE_CHECK_SECONDS", "1"))
+# Autosaved answers are buffered per process and written to AnswerDraft this often.
+DRAFT_FLUSH_SECONDS = float(os.getenv("DRAFT_FLUSH_SECONDS", "2"))
+# Stored responses for Idempotency-Key retries on start/submit.
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+# Difficulty-bucketed question pools: answer counts are written this often and re-read after the refresh period.
+SAMPLING_FLUSH_SECONDS = float(os.getenv("SAMPLING_FLUSH_SECONDS", "5"))
+SAMPLING_REFRESH_SECONDS = int(os.getenv("SAMPLING_REFRESH_SECONDS", "300"))
+# compact_demo_results folds demo attempts older than this into DemoAttempt aggregates.
+DEMO_RESULT_RETENTION_DAYS = int(os.getenv("DEMO_RESULT_RETENTION_DAYS", "30"))
+# db_maintenance: open exam windows are module duration + grace since the last draft/submit;
+# --scheduled runs give up after this busy/lock timeout instead of waiting on app writes.
+DB_MAINTENANCE_GRACE_MINUTES = int(os.getenv("DB_MAINTENANCE_GRACE_MINUTES", "10"))
+DB_MAINTENANCE_BUSY_TIMEOUT_MS = int(os.getenv("DB_MAINTENANCE_BUSY_TIMEOUT_MS", "2000"))
+DB_MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv("DB_MAINTENANCE_ANALYSIS_LIMIT", "1000"))
+# In-memory leaderboards reload from the rank table after this long (other workers' inserts).
+LEADERBOARD_TTL_SECONDS = int(os.getenv("LEADERBOARD_TTL_SECONDS", "30"))
+
+# Empty = SQLite FTS5 on sqlite, ORM substring search elsewhere.
+QUESTION_SEARCH_BACKEND = os.getenv("QUESTION_SEARCH_BACKEND", "")
+
 CORS_ALLOW_ALL_ORIGINS = os.getenv("CORS_ALLOW_ALL_ORIGINS", "True").lower() == "true"
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
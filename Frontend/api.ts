@@ -73,9 +73,25 @@ export async function syncSnapshot(snapshot: any) {
   });
 }
 
-export async function submitTest(payload: { moduleId: string | number; answers: Record<string, number>; timeTaken?: number }) {
+export async function submitTest(
+  payload: { moduleId: string | number; answers: Record<string, number>; timeTaken?: number },
+  idempotencyKey?: string,
+) {
   return request('/tests/submit/', {
     method: 'POST',
     body: JSON.stringify(payload),
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
   });
 }
+
+export async function getMySummary() {
+  return request('/tests/summary/');
+}
+
+export function openLiveMonitor(handlers: { onResult?: (result: any) => void; onCounts?: (rows: any[]) => void }) {
+  const token = authStorage.getAccess() || '';
+  const source = new EventSource(`${API_BASE}/live/?token=${encodeURIComponent(token)}`);
+  if (handlers.onResult) source.addEventListener('result', (e) => handlers.onResult!(JSON.parse((e as MessageEvent).data)));
+  if (handlers.onCounts) source.addEventListener('counts', (e) => handlers.onCounts!(JSON.parse((e as MessageEvent).data)));
+  return source;
+}